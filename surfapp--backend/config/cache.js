@@ -33,8 +33,48 @@ const clearCache = () => {
     cache.timestamp = null;
 };
 
+// Session insights per user. They only change when the user's sessions do, so
+// entries are invalidated explicitly; the expiry is just a safety net.
+const insightsCache = new Map();
+const INSIGHTS_CACHE_DURATION_MS = 30 * 60 * 1000;
+const MAX_INSIGHTS_ENTRIES = 500;
+
+// Returns undefined on a miss (null is a valid cached value: too few sessions)
+const getCachedInsights = (userId) => {
+    const entry = insightsCache.get(userId);
+    if (!entry) {
+        return undefined;
+    }
+    
+    if (Date.now() - entry.timestamp > INSIGHTS_CACHE_DURATION_MS) {
+        insightsCache.delete(userId);
+        return undefined;
+    }
+    
+    // Re-insert to keep Map order least-recently-used first
+    insightsCache.delete(userId);
+    insightsCache.set(userId, entry);
+    return entry.insights;
+};
+
+const setCachedInsights = (userId, insights) => {
+    insightsCache.delete(userId);
+    insightsCache.set(userId, { insights, timestamp: Date.now() });
+    
+    if (insightsCache.size > MAX_INSIGHTS_ENTRIES) {
+        insightsCache.delete(insightsCache.keys().next().value);
+    }
+};
+
+const invalidateInsights = (userId) => {
+    insightsCache.delete(String(userId));
+};
+
 module.exports = {
     getCachedData,
     setCachedData,
-    clearCache
+    clearCache,
+    getCachedInsights,
+    setCachedInsights,
+    invalidateInsights
 };
@@ -0,0 +1,159 @@
+const { spawn } = require('child_process');
+const path = require('path');
+const { PYTHON_EXECUTABLE } = require('./python');
+
+const ML_ENGINE_DIR = path.resolve(__dirname, '..', '..', 'surfapp--ml-engine');
+
+// Per-request limit, counted only once the worker is ready. It has to cover the
+// worst-case StormGlass key rotation (10s API timeout per key, probed across the pool).
+const DEFAULT_TIMEOUT_MS = parseInt(process.env.PYTHON_WORKER_TIMEOUT_MS, 10) || 120000;
+// Imports, model load and warmup of a (re)started worker; not charged to any request
+const DEFAULT_STARTUP_TIMEOUT_MS = parseInt(process.env.PYTHON_WORKER_STARTUP_TIMEOUT_MS, 10) || 300000;
+
+const isReadyLine = (line) => {
+    try {
+        return JSON.parse(line).ready === true;
+    } catch (error) {
+        return false;
+    }
+};
+
+/**
+ * Long-lived Python service started with --serve.
+ * Models are loaded once per process instead of once per request: each request is
+ * one JSON line on stdin, answered by one JSON line on stdout, strictly in order.
+ * The worker prints {"ready": true} once it has loaded; request timeouts start then.
+ * The process is (re)started on first use (or warm()) and after it exits.
+ */
+const createPythonWorker = (script, {
+    name = path.basename(script),
+    timeoutMs = DEFAULT_TIMEOUT_MS,
+    startupTimeoutMs = DEFAULT_STARTUP_TIMEOUT_MS
+} = {}) => {
+    let child = null;
+    let ready = false;
+    let startupTimer = null;
+    let buffer = '';
+    // FIFO of in-flight requests; replies arrive in the same order
+    const pending = [];
+
+    const failPending = (error) => {
+        while (pending.length > 0) {
+            const entry = pending.shift();
+            clearTimeout(entry.timer);
+            if (!entry.settled) entry.reject(error);
+        }
+    };
+
+    // Kill the current worker (hung, or never became ready) and fail what it still owes.
+    // Otherwise an unanswered request stays at the head of the FIFO and every later
+    // request times out behind it. The next request respawns the worker.
+    const restart = (error) => {
+        const proc = child;
+        child = null;
+        clearTimeout(startupTimer);
+        failPending(error);
+        if (proc) proc.kill();
+    };
+
+    const armTimeout = (entry) => {
+        entry.timer = setTimeout(() => {
+            entry.settled = true;
+            entry.reject(new Error(`${name} worker timed out after ${timeoutMs / 1000}s`));
+            restart(new Error(`${name} worker restarted after a timeout`));
+        }, timeoutMs);
+    };
+
+    const start = () => {
+        const proc = spawn(PYTHON_EXECUTABLE, [script, '--serve'], { cwd: ML_ENGINE_DIR });
+        child = proc;
+        ready = false;
+        buffer = '';
+
+        startupTimer = setTimeout(() => {
+            if (child === proc && !ready) {
+                restart(new Error(`${name} worker did not become ready within ${startupTimeoutMs / 1000}s`));
+            }
+        }, startupTimeoutMs);
+
+        proc.stdout.on('data', (data) => {
+            // Output of a worker that was already replaced belongs to nobody
+            if (child !== proc) return;
+            buffer += data.toString();
+            let newline;
+            while ((newline = buffer.indexOf('\n')) !== -1) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (!line) continue;
+
+                if (!ready) {
+                    // Loaded: start the clock for requests queued during startup
+                    ready = true;
+                    clearTimeout(startupTimer);
+                    pending.forEach(armTimeout);
+                    if (isReadyLine(line)) continue;
+                }
+
+                const entry = pending.shift();
+                if (!entry) continue;
+                clearTimeout(entry.timer);
+                if (entry.settled) continue;
+                entry.settled = true;
+
+                try {
+                    entry.resolve(JSON.parse(line));
+                } catch (error) {
+                    entry.reject(error);
+                }
+            }
+        });
+
+        // Writes to a worker that just died surface through 'exit' below
+        proc.stdin.on('error', (error) => {
+            console.error(`${name} worker stdin error:`, error.message);
+        });
+
+        proc.stderr.on('data', (data) => {
+            console.log(`[${name}]: ${data.toString().trim()}`);
+        });
+
+        proc.on('error', (error) => {
+            console.error(`${name} worker failed to start:`, error.message);
+        });
+
+        proc.on('exit', (code) => {
+            console.log(`${name} worker exited (code ${code})`);
+            // A worker killed by restart() has already been replaced and its requests failed
+            if (child !== proc) return;
+            child = null;
+            clearTimeout(startupTimer);
+            failPending(new Error(`${name} worker exited`));
+        });
+    };
+
+    const request = (payload) => new Promise((resolve, reject) => {
+        if (!child) start();
+
+        const entry = { resolve, reject, settled: false };
+        // Before the ready line the timer is armed by the stdout handler instead
+        if (ready) armTimeout(entry);
+        pending.push(entry);
+
+        child.stdin.write(JSON.stringify(payload) + '\n');
+    });
+
+    // Start ahead of the first request so model loading and warmup happen at boot
+    const warm = () => {
+        if (!child) start();
+    };
+
+    const stop = () => {
+        if (child) child.kill();
+    };
+
+    return { request, warm, stop };
+};
+
+module.exports = {
+    createPythonWorker
+};
@@ -1,5 +1,6 @@
 const Session = require('../models/Session');
 const User = require('../models/User');
+const { invalidateInsights } = require('../config/cache');
 
 /**
  * Start a new surf session
@@ -49,6 +50,7 @@ exports.startSession = async (req, res) => {
     });
     
     await session.save();
+    invalidateInsights(userId);
     
     console.log(`Session started: ${session._id} for user ${userId} at ${spotName}`);
     
@@ -102,16 +104,20 @@ exports.endSession = async (req, res) => {
     
     // Duration and enjoyment are calculated automatically in pre-save hook
     await session.save();
+    invalidateInsights(session.userId);
     
     // Update user stats
     try {
-      const user = await User.findById(session.userId);
+      // Single atomic round trip instead of find + save; concurrent session ends can't lose increments
+      const user = await User.findByIdAndUpdate(
+        session.userId,
+        {
+          $inc: { 'stats.totalSessions': 1, 'stats.totalHours': session.duration / 60 },
+          $set: { 'stats.lastSessionDate': session.endTime }
+        },
+        { new: true }
+      );
       if (user) {
-        user.stats.totalSessions += 1;
-        user.stats.totalHours += (session.duration / 60);
-        user.stats.lastSessionDate = session.endTime;
-        await user.save();
-        
         // Update learned preferences if enough sessions
         if (user.stats.totalSessions % 5 === 0) {
           await user.updateLearnedPreferences();
@@ -233,7 +239,7 @@ exports.getSpotStats = async (req, res) => {
   try {
     const { spotId } = req.params;
     
-    const sessions = await Session.find({ spotId });
+    const sessions = await Session.find({ spotId }).lean();
     
     if (sessions.length === 0) {
       return res.json({
@@ -243,10 +249,7 @@ exports.getSpotStats = async (req, res) => {
       });
     }
     
-    const avgRating = sessions.filter(s => s.rating).reduce((sum, s) => sum + s.rating, 0) / 
-                      sessions.filter(s => s.rating).length;
-    
-    const avgDuration = sessions.reduce((sum, s) => sum + (s.duration || 0), 0) / sessions.length;
+    const { avgDuration, avgRating } = Session.summarizeSessions(sessions);
     
     // Most common crowd level
     const crowdCounts = sessions.reduce((acc, s) => {
@@ -259,7 +262,7 @@ exports.getSpotStats = async (req, res) => {
       spotId,
       spotName: sessions[0].spotName,
       totalSessions: sessions.length,
-      avgRating: avgRating.toFixed(1),
+      avgRating: avgRating !== null ? avgRating.toFixed(1) : null,
       avgDuration: Math.round(avgDuration),
       mostCommonCrowdLevel: mostCommonCrowd,
       lastSession: sessions[sessions.length - 1].createdAt
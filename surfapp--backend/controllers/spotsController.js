@@ -1,13 +1,15 @@
-const { spawn } = require('child_process');
-const path = require('path');
 const moment = require('moment');
-const { PYTHON_EXECUTABLE, SPOT_RECOMMENDER_SCRIPT } = require('../config/python');
-const { getCachedData, setCachedData } = require('../config/cache');
+const { SPOT_RECOMMENDER_SCRIPT } = require('../config/python');
+const { createPythonWorker } = require('../config/pythonWorker');
+const { getCachedData, setCachedData, getCachedInsights, setCachedInsights } = require('../config/cache');
 const { getSpotMetadata } = require('../config/spotMetadata');
 const EnhancedSuitabilityCalculator = require('./EnhancedSuitabilityCalculator');
 
 const suitabilityCalculator = new EnhancedSuitabilityCalculator();
 
+// One resident spot recommender process: the Random Forest and spot list load once, not per request
+const spotWorker = createPythonWorker(SPOT_RECOMMENDER_SCRIPT, { name: 'PYTHON LOG' });
+
 // Helper function to sanitize data
 const sanitizeNumber = (value) => {
     if (typeof value === 'number' && (isNaN(value) || !isFinite(value))) {
@@ -71,63 +73,83 @@ const calculateEnhancedSpots = (spotsWithPredictions, userPreferences) => {
 const loadSessionInsights = async (userId) => {
     if (!userId) return null;
     
+    const cached = getCachedInsights(userId);
+    if (cached !== undefined) {
+        return cached;
+    }
+    
     try {
         const Session = require('../models/Session');
-        const sessions = await Session.find({ userId }).sort({ createdAt: -1 }).limit(50);
+        // Plain objects with only the fields used below: skips Mongoose document hydration
+        const sessions = await Session.find({ userId })
+            .sort({ createdAt: -1 })
+            .limit(50)
+            .select('spotName rating conditions.waveHeight conditions.windSpeed')
+            .lean();
         
-        if (sessions.length < 5) return null;
+        if (sessions.length < 5) {
+            setCachedInsights(userId, null);
+            return null;
+        }
         
         console.log(`Loading session insights for user ${userId} (${sessions.length} sessions)`);
         
         const insights = {};
         
-        // Filter high-rated sessions (4-5 stars)
-        const highRatedSessions = sessions.filter(s => s.rating >= 4);
+        // Single pass: high-rated (4-5 stars) wave/wind sums plus per-spot visit and rating totals
+        let highRatedCount = 0;
+        let waveSum = 0, waveCount = 0;
+        let windSum = 0, windCount = 0;
+        const spotStats = new Map();
         
-        if (highRatedSessions.length > 0) {
-            // Learn preferred wave height
-            const waveHeights = highRatedSessions
-                .map(s => s.conditions?.waveHeight)
-                .filter(h => h != null && h > 0);
+        for (const s of sessions) {
+            if (s.rating >= 4) {
+                highRatedCount++;
+                const waveHeight = s.conditions?.waveHeight;
+                if (waveHeight != null && waveHeight > 0) {
+                    waveSum += waveHeight;
+                    waveCount++;
+                }
+                const windSpeed = s.conditions?.windSpeed;
+                if (windSpeed != null && windSpeed > 0) {
+                    windSum += windSpeed;
+                    windCount++;
+                }
+            }
             
-            if (waveHeights.length > 0) {
-                insights.learnedWaveHeight = 
-                    waveHeights.reduce((a, b) => a + b, 0) / waveHeights.length;
+            if (s.spotName) {
+                let stats = spotStats.get(s.spotName);
+                if (!stats) {
+                    stats = { name: s.spotName, visitCount: 0, ratingSum: 0, ratingCount: 0 };
+                    spotStats.set(s.spotName, stats);
+                }
+                stats.visitCount++;
+                if (s.rating) {
+                    stats.ratingSum += s.rating;
+                    stats.ratingCount++;
+                }
+            }
+        }
+        
+        if (highRatedCount > 0) {
+            // Learn preferred wave height
+            if (waveCount > 0) {
+                insights.learnedWaveHeight = waveSum / waveCount;
                 console.log(`  Learned wave preference: ${insights.learnedWaveHeight.toFixed(2)}m`);
             }
             
             // Learn preferred wind speed
-            const windSpeeds = highRatedSessions
-                .map(s => s.conditions?.windSpeed)
-                .filter(w => w != null && w > 0);
-            
-            if (windSpeeds.length > 0) {
-                insights.learnedWindSpeed = 
-                    windSpeeds.reduce((a, b) => a + b, 0) / windSpeeds.length;
+            if (windCount > 0) {
+                insights.learnedWindSpeed = windSum / windCount;
                 console.log(`  Learned wind preference: ${insights.learnedWindSpeed.toFixed(1)} km/h`);
             }
             
-            // Get favorite spots
-            const spotCounts = {};
-            const spotRatings = {};
-            
-            sessions.forEach(s => {
-                const spotName = s.spotName;
-                if (spotName) {
-                    spotCounts[spotName] = (spotCounts[spotName] || 0) + 1;
-                    if (!spotRatings[spotName]) spotRatings[spotName] = [];
-                    if (s.rating) spotRatings[spotName].push(s.rating);
-                }
-            });
-            
-            // Calculate average ratings per spot
-            const favoriteSpots = Object.keys(spotCounts)
-                .map(spotName => ({
-                    name: spotName,
-                    visitCount: spotCounts[spotName],
-                    avgRating: spotRatings[spotName].length > 0 
-                        ? spotRatings[spotName].reduce((a, b) => a + b) / spotRatings[spotName].length 
-                        : 0
+            // Favorite spots: most visited, then highest average rating
+            const favoriteSpots = [...spotStats.values()]
+                .map(stats => ({
+                    name: stats.name,
+                    visitCount: stats.visitCount,
+                    avgRating: stats.ratingCount > 0 ? stats.ratingSum / stats.ratingCount : 0
                 }))
                 .sort((a, b) => {
                     if (b.visitCount !== a.visitCount) return b.visitCount - a.visitCount;
@@ -140,6 +162,7 @@ const loadSessionInsights = async (userId) => {
             console.log(`  Favorite spots: ${favoriteSpots.join(', ')}`);
         }
         
+        setCachedInsights(userId, insights);
         return insights;
     } catch (error) {
         console.error('Error loading session insights:', error.message);
@@ -187,91 +210,61 @@ const getSpots = async (req, res) => {
         }
     }
     
-    // Fetch new data from Python script
+    // Fetch new data from the Python spot recommender
     console.log("Cache is stale or empty. Fetching new data from Python script.");
-    const pythonProcess = spawn(PYTHON_EXECUTABLE, [SPOT_RECOMMENDER_SCRIPT], {
-        cwd: path.resolve(__dirname, '..', '..', 'surfapp--ml-engine')
-    });
-
-    let pythonOutput = '';
-    let pythonError = '';
-    let hasResponded = false;
-
-    // Set timeout for Python process (30 seconds)
-    const timeout = setTimeout(() => {
-        if (!hasResponded) {
-            pythonProcess.kill();
-            console.error('Python process timed out');
-            res.status(504).json({ error: 'ML prediction timed out' });
-            hasResponded = true;
+    let model1Result;
+    try {
+        model1Result = await spotWorker.request({});
+    } catch (error) {
+        console.error('Python spot recommender failed:', error.message);
+        if (error.message.includes('timed out')) {
+            return res.status(504).json({ error: 'ML prediction timed out' });
         }
-    }, 30000);
+        return res.status(500).json({ 
+            error: 'ML prediction failed', 
+            details: process.env.NODE_ENV === 'development' ? error.message : undefined 
+        });
+    }
 
-    pythonProcess.stdout.on('data', (data) => pythonOutput += data.toString());
-    pythonProcess.stderr.on('data', (data) => {
-        pythonError += data.toString();
-        console.log(`[PYTHON LOG]: ${data.toString().trim()}`);
-    });
+    if (model1Result.error) {
+        console.error(`Python script failed: ${model1Result.error}`);
+        return res.status(500).json({ 
+            error: 'ML prediction failed', 
+            details: process.env.NODE_ENV === 'development' ? model1Result.error : undefined 
+        });
+    }
 
-    pythonProcess.on('error', (error) => {
-        clearTimeout(timeout);
-        if (!hasResponded) {
-            console.error('Failed to start Python process:', error);
-            res.status(500).json({ error: 'Failed to start ML service', details: error.message });
-            hasResponded = true;
+    try {
+        if (!model1Result.spots || !Array.isArray(model1Result.spots)) {
+            throw new Error('Invalid data structure from Python script');
         }
-    });
 
-    pythonProcess.on('close', (code) => {
-        clearTimeout(timeout);
+        const spotsWithPredictions = model1Result.spots;
         
-        if (hasResponded) return;
-        hasResponded = true;
-
-        console.log(`Python process exited with code: ${code}`);
-
-        if (code !== 0) {
-            console.error(`Python script failed. Code: ${code}. Error: ${pythonError}`);
-            return res.status(500).json({ 
-                error: 'ML prediction failed', 
-                details: process.env.NODE_ENV === 'development' ? pythonError : undefined 
-            });
-        }
-
-        try {
-            if (!pythonOutput || pythonOutput.trim() === '') {
-                throw new Error('Python script returned empty output');
-            }
-
-            const model1Result = JSON.parse(pythonOutput);
-            
-            if (!model1Result.spots || !Array.isArray(model1Result.spots)) {
-                throw new Error('Invalid data structure from Python script');
-            }
-
-            const spotsWithPredictions = model1Result.spots;
-            
-            // Store in cache
-            setCachedData(spotsWithPredictions);
-            console.log(`Updated cache with ${spotsWithPredictions.length} spots.`);
+        // Store in cache
+        setCachedData(spotsWithPredictions);
+        console.log(`Updated cache with ${spotsWithPredictions.length} spots.`);
 
-            // Calculate enhanced suitability
-            const enhancedSpots = calculateEnhancedSpots(spotsWithPredictions, userPreferences);
-            const sanitizedSpots = enhancedSpots.map(sanitizeObject);
-            sanitizedSpots.sort((a, b) => b.score - a.score);
-            
-            res.json({ spots: sanitizedSpots });
-            
-        } catch (error) {
-            console.error('Error processing Python output or scoring:', error);
-            res.status(500).json({ 
-                error: 'Failed to process prediction data',
-                details: process.env.NODE_ENV === 'development' ? error.message : undefined 
-            });
-        }
-    });
+        // Calculate enhanced suitability
+        const enhancedSpots = calculateEnhancedSpots(spotsWithPredictions, userPreferences);
+        const sanitizedSpots = enhancedSpots.map(sanitizeObject);
+        sanitizedSpots.sort((a, b) => b.score - a.score);
+        
+        res.json({ spots: sanitizedSpots });
+        
+    } catch (error) {
+        console.error('Error processing Python output or scoring:', error);
+        res.status(500).json({ 
+            error: 'Failed to process prediction data',
+            details: process.env.NODE_ENV === 'development' ? error.message : undefined 
+        });
+    }
 };
 
+// Called at server start: the worker loads and warms the Random Forest before any request arrives
+const warmSpotWorker = () => spotWorker.warm();
+
 module.exports = {
-    getSpots
+    getSpots,
+    warmSpotWorker
 };
@@ -118,8 +118,11 @@ sessionSchema.statics.getFavoriteSpots = async function(userId, limit = 5) {
 };
 
 // Static method to analyze user's preferred conditions
-sessionSchema.statics.getPreferredConditions = async function(userId) {
-  const sessions = await this.find({ userId, rating: { $gte: 4 } }); // Only highly rated sessions
+// Pass the user's already-loaded sessions to skip a second query
+sessionSchema.statics.getPreferredConditions = async function(userId, userSessions = null) {
+  const sessions = userSessions
+    ? userSessions.filter(s => s.rating >= 4)
+    : await this.find({ userId, rating: { $gte: 4 } }).lean(); // Only highly rated sessions
   
   if (sessions.length === 0) {
     return null;
@@ -165,9 +168,29 @@ sessionSchema.statics.getBestTimeOfDay = async function(userId) {
   }));
 };
 
+// Average duration (over all sessions) and rating (over rated ones) in one pass
+const summarizeSessions = (sessions) => {
+  let durationSum = 0;
+  let ratingSum = 0;
+  let ratedCount = 0;
+  for (const s of sessions) {
+    durationSum += s.duration || 0;
+    if (s.rating) {
+      ratingSum += s.rating;
+      ratedCount++;
+    }
+  }
+  return {
+    avgDuration: durationSum / sessions.length,
+    avgRating: ratedCount > 0 ? ratingSum / ratedCount : null
+  };
+};
+
+sessionSchema.statics.summarizeSessions = summarizeSessions;
+
 // Static method to get user insights
 sessionSchema.statics.getUserInsights = async function(userId) {
-  const sessions = await this.find({ userId });
+  const sessions = await this.find({ userId }).lean();
   
   if (sessions.length === 0) {
     return {
@@ -176,13 +199,14 @@ sessionSchema.statics.getUserInsights = async function(userId) {
     };
   }
   
-  const favoriteSpots = await this.getFavoriteSpots(userId, 3);
-  const preferredConditions = await this.getPreferredConditions(userId);
-  const bestTimes = await this.getBestTimeOfDay(userId);
+  // The two aggregations run in parallel; preferred conditions reuse the sessions above
+  const [favoriteSpots, preferredConditions, bestTimes] = await Promise.all([
+    this.getFavoriteSpots(userId, 3),
+    this.getPreferredConditions(userId, sessions),
+    this.getBestTimeOfDay(userId)
+  ]);
   
-  const avgDuration = sessions.reduce((sum, s) => sum + (s.duration || 0), 0) / sessions.length;
-  const avgRating = sessions.filter(s => s.rating).reduce((sum, s) => sum + s.rating, 0) / 
-                    sessions.filter(s => s.rating).length;
+  const { avgDuration, avgRating } = summarizeSessions(sessions);
   
   return {
     totalSessions: sessions.length,
@@ -15,6 +15,8 @@ const forecastRoutes = require('./routes/forecast');
 const healthRoutes = require('./routes/health');
 const sessionRoutes = require('./routes/sessions');
 const authRoutes = require('./routes/auth');
+const { warmForecastWorker } = require('./controllers/forecastController');
+const { warmSpotWorker } = require('./controllers/spotsController');
 
 const app = express();
 const PORT = process.env.PORT || 3000;
@@ -56,4 +58,8 @@ app.use((err, req, res, next) => {
 app.listen(PORT, () => {
     console.log(`🌊 Surf Ceylon Backend running on http://localhost:${PORT}`);
     console.log(`📍 Environment: ${process.env.NODE_ENV || 'development'}`);
+    
+    // Load the ML models now rather than on the first user request
+    warmForecastWorker();
+    warmSpotWorker();
 });
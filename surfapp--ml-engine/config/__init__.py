@@ -1,49 +1,105 @@
-"""Python package initialization for config module"""
-from .api_keys import get_next_api_key, rotate_to_next_key, get_total_keys, API_KEYS
-from .model_paths import (
-    RANDOM_FOREST_MODEL,
-    LSTM_MODEL,
-    LSTM_SCALER_X,
-    LSTM_SCALER_Y,
-    LSTM_FEATURE_NAMES,
-    validate_model_exists,
-    get_model_info
-)
-from .features import (
-    RANDOM_FOREST_BASE_FEATURES,
-    RANDOM_FOREST_ENGINEERED_FEATURES,
-    RANDOM_FOREST_ALL_FEATURES,
-    RANDOM_FOREST_TARGETS,
-    LSTM_FEATURE_COLUMNS,
-    LSTM_TARGET_COLUMNS,
-    FEATURE_NAMES,
-    TARGET_NAMES,
-    FEATURE_COLS
-)
-from .settings import (
-    USE_MOCK_DATA,
-    API_TIMEOUT,
-    MAX_API_RETRIES,
-    RETRY_DELAY_SECONDS,
-    REGIONS,
-    ENABLE_RANDOM_FOREST,
-    ENABLE_LSTM,
-    VERBOSE_LOGGING
-)
+"""Python package initialization for config module
+
+Attributes are loaded lazily (PEP 562): each submodule is only imported the first
+time one of its names is accessed, so `import config` itself does no I/O.
+"""
+import importlib
+
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    # API Keys
+    'get_next_api_key': '.api_keys',
+    'rotate_to_next_key': '.api_keys',
+    'rotate_past_key': '.api_keys',
+    'get_total_keys': '.api_keys',
+    'require_api_keys': '.api_keys',
+    'API_KEYS': '.api_keys',
+    'NO_API_KEYS_MESSAGE': '.api_keys',
+
+    # Model Paths
+    'RANDOM_FOREST_MODEL': '.model_paths',
+    'RANDOM_FOREST_ONNX_MODEL': '.model_paths',
+    'LSTM_MODEL': '.model_paths',
+    'LSTM_SCALER_X': '.model_paths',
+    'LSTM_SCALER_Y': '.model_paths',
+    'LSTM_SCALER_PARAMS': '.model_paths',
+    'LSTM_FEATURE_NAMES': '.model_paths',
+    'LSTM_ONNX_MODEL': '.model_paths',
+    'LSTM_TFLITE_MODEL': '.model_paths',
+    'validate_model_exists': '.model_paths',
+    'get_model_info': '.model_paths',
+
+    # Features
+    'RANDOM_FOREST_BASE_FEATURES': '.features',
+    'RANDOM_FOREST_ENGINEERED_FEATURES': '.features',
+    'RANDOM_FOREST_ALL_FEATURES': '.features',
+    'RANDOM_FOREST_TARGETS': '.features',
+    'LSTM_FEATURE_COLUMNS': '.features',
+    'LSTM_TARGET_COLUMNS': '.features',
+    'FEATURE_NAMES': '.features',
+    'TARGET_NAMES': '.features',
+    'FEATURE_COLS': '.features',
+
+    # Settings
+    'USE_MOCK_DATA': '.settings',
+    'MOCK_DATA_SEED': '.settings',
+    'API_TIMEOUT': '.settings',
+    'SPOT_FETCH_CONCURRENCY': '.settings',
+    'API_KEY_PROBE_CONCURRENCY': '.settings',
+    'HISTORICAL_CACHE_TTL_SECONDS': '.settings',
+    'HISTORICAL_CACHE_STALE_SECONDS': '.settings',
+    'HISTORICAL_CACHE_DIR': '.settings',
+    'WEATHER_CACHE_TTL_SECONDS': '.settings',
+    'WEATHER_CACHE_DIR': '.settings',
+    'API_KEY_STATE_FILE': '.settings',
+    'MAX_API_RETRIES': '.settings',
+    'RETRY_DELAY_SECONDS': '.settings',
+    'REGIONS': '.settings',
+    'ENABLE_RANDOM_FOREST': '.settings',
+    'ENABLE_LSTM': '.settings',
+    'INFERENCE_THREADS': '.settings',
+    'LSTM_PRECISION': '.settings',
+    'LSTM_XLA': '.settings',
+    'LSTM_BACKEND': '.settings',
+    'LSTM_PREDICTION_CACHE_SIZE': '.settings',
+    'VERBOSE_LOGGING': '.settings'
+}
+
+
+def __getattr__(name):
+    """Import the owning submodule on first access and cache the attribute on the package"""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __all__ = [
     # API Keys
     'get_next_api_key',
     'rotate_to_next_key',
+    'rotate_past_key',
     'get_total_keys',
+    'require_api_keys',
     'API_KEYS',
+    'NO_API_KEYS_MESSAGE',
     
     # Model Paths
     'RANDOM_FOREST_MODEL',
+    'RANDOM_FOREST_ONNX_MODEL',
     'LSTM_MODEL',
     'LSTM_SCALER_X',
     'LSTM_SCALER_Y',
+    'LSTM_SCALER_PARAMS',
     'LSTM_FEATURE_NAMES',
+    'LSTM_ONNX_MODEL',
+    'LSTM_TFLITE_MODEL',
     'validate_model_exists',
     'get_model_info',
     
@@ -60,11 +116,25 @@ __all__ = [
     
     # Settings
     'USE_MOCK_DATA',
+    'MOCK_DATA_SEED',
     'API_TIMEOUT',
+    'SPOT_FETCH_CONCURRENCY',
+    'API_KEY_PROBE_CONCURRENCY',
+    'HISTORICAL_CACHE_TTL_SECONDS',
+    'HISTORICAL_CACHE_STALE_SECONDS',
+    'HISTORICAL_CACHE_DIR',
+    'WEATHER_CACHE_TTL_SECONDS',
+    'WEATHER_CACHE_DIR',
+    'API_KEY_STATE_FILE',
     'MAX_API_RETRIES',
     'RETRY_DELAY_SECONDS',
     'REGIONS',
     'ENABLE_RANDOM_FOREST',
     'ENABLE_LSTM',
+    'INFERENCE_THREADS',
+    'LSTM_PRECISION',
+    'LSTM_XLA',
+    'LSTM_BACKEND',
+    'LSTM_PREDICTION_CACHE_SIZE',
     'VERBOSE_LOGGING'
 ]
@@ -7,12 +7,20 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Model 1: Random Forest (for spot recommendations)
 RANDOM_FOREST_MODEL = os.path.join(BASE_DIR, 'surf_forecast_model.joblib')
+# Optional ONNX export of the Random Forest (see training/export_random_forest_onnx.py)
+RANDOM_FOREST_ONNX_MODEL = os.path.join(BASE_DIR, 'surf_forecast_model.onnx')
 
 # Model 2: LSTM (for 7-day forecasts)
 LSTM_MODEL = os.path.join(BASE_DIR, 'wave_forecast_multioutput_lstm.keras')
 LSTM_SCALER_X = os.path.join(BASE_DIR, 'wave_forecast_scaler_X_multioutput.joblib')
 LSTM_SCALER_Y = os.path.join(BASE_DIR, 'wave_forecast_scaler_y_multioutput.joblib')
 LSTM_FEATURE_NAMES = os.path.join(BASE_DIR, 'wave_forecast_feature_names.joblib')
+# mean_/scale_ of both scalers as plain arrays; loaded instead of the pickles when present
+LSTM_SCALER_PARAMS = os.path.join(BASE_DIR, 'wave_forecast_scalers_multioutput.npz')
+# Optional ONNX export of the LSTM (see training/export_lstm_onnx.py)
+LSTM_ONNX_MODEL = os.path.join(BASE_DIR, 'wave_forecast_multioutput_lstm.onnx')
+# Optional int8 TFLite export of the LSTM (see training/export_lstm_tflite.py)
+LSTM_TFLITE_MODEL = os.path.join(BASE_DIR, 'wave_forecast_multioutput_lstm.tflite')
 
 # Artifacts directory for organized storage
 ARTIFACTS_DIR = os.path.join(BASE_DIR, 'artifacts')
@@ -31,17 +39,21 @@ def validate_model_exists(model_path, model_name):
         return False
     return True
 
+def _stat_or_none(path):
+    """Single stat() call per file; None if it does not exist"""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
 def get_model_info():
     """Get information about all models"""
-    return {
-        'random_forest': {
-            'path': RANDOM_FOREST_MODEL,
-            'exists': os.path.exists(RANDOM_FOREST_MODEL),
-            'size_mb': os.path.getsize(RANDOM_FOREST_MODEL) / (1024*1024) if os.path.exists(RANDOM_FOREST_MODEL) else 0
-        },
-        'lstm': {
-            'path': LSTM_MODEL,
-            'exists': os.path.exists(LSTM_MODEL),
-            'size_mb': os.path.getsize(LSTM_MODEL) / (1024*1024) if os.path.exists(LSTM_MODEL) else 0
+    info = {}
+    for name, path in (('random_forest', RANDOM_FOREST_MODEL), ('lstm', LSTM_MODEL)):
+        st = _stat_or_none(path)
+        info[name] = {
+            'path': path,
+            'exists': st is not None,
+            'size_mb': st.st_size / (1024*1024) if st else 0
         }
-    }
+    return info
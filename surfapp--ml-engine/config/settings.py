@@ -6,9 +6,45 @@ import os
 # Set to False to use real StormGlass API data
 USE_MOCK_DATA = True  # Model 1 enabled - uses ML predictions with mock weather data
 
+# Seed for mock data generation (unset = different data every run)
+MOCK_DATA_SEED = int(os.environ['MOCK_DATA_SEED']) if os.getenv('MOCK_DATA_SEED') else None
+
 # API request timeout (seconds)
 API_TIMEOUT = 10
 
+# Simultaneous StormGlass fetches when building spot recommendations.
+# The fetches are network-bound, so this can exceed the core count.
+SPOT_FETCH_CONCURRENCY = int(os.getenv('SPOT_FETCH_CONCURRENCY', 16))
+
+# After the current API key fails, probe up to this many keys at once
+API_KEY_PROBE_CONCURRENCY = int(os.getenv('API_KEY_PROBE_CONCURRENCY', 3))
+
+# Keys that hit their daily quota (402/429) and the last key that worked, shared
+# across processes so a new run does not re-probe exhausted keys. Empty = disabled.
+API_KEY_STATE_FILE = os.getenv(
+    'API_KEY_STATE_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'api_key_state.json')
+)
+
+# Disk cache for historical API fetches (keyed by rounded lat/lng).
+# Fresh for TTL seconds; usable as a stale fallback until STALE seconds.
+# Set HISTORICAL_CACHE_TTL_SECONDS=0 to disable.
+HISTORICAL_CACHE_TTL_SECONDS = int(os.getenv('HISTORICAL_CACHE_TTL_SECONDS', 3600))
+HISTORICAL_CACHE_STALE_SECONDS = int(os.getenv('HISTORICAL_CACHE_STALE_SECONDS', 6 * 3600))
+HISTORICAL_CACHE_DIR = os.getenv(
+    'HISTORICAL_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'historical')
+)
+
+# Disk cache for current-conditions fetches (spot recommendations), keyed by
+# rounded lat/lng and the UTC hour the forecast starts at, so entries never
+# outlive the hour they describe. Set WEATHER_CACHE_TTL_SECONDS=0 to disable.
+WEATHER_CACHE_TTL_SECONDS = int(os.getenv('WEATHER_CACHE_TTL_SECONDS', 3600))
+WEATHER_CACHE_DIR = os.getenv(
+    'WEATHER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'weather')
+)
+
 # Retry configuration for API calls
 MAX_API_RETRIES = 3
 RETRY_DELAY_SECONDS = 1
@@ -33,6 +69,26 @@ REGIONS = {
 ENABLE_RANDOM_FOREST = True   # Model 1: Spot recommendations
 ENABLE_LSTM = True            # Model 2: 7-day forecasts
 
+# CPU threads for model inference (intra-op); defaults to all cores
+INFERENCE_THREADS = int(os.getenv('INFERENCE_THREADS', os.cpu_count() or 1))
+
+# LSTM compute precision: 'float32' (default), 'mixed_float16' (GPU only) or
+# 'mixed_bfloat16' (GPU, or CPUs with AVX-512 BF16 / AMX through oneDNN).
+# A mixed-precision model that drifts too far from float32 is not used.
+LSTM_PRECISION = os.getenv('LSTM_PRECISION', 'float32')
+
+# Unroll the fixed 168-step LSTM layers and XLA-compile inference (jit_compile).
+# Compilation takes seconds, so this pays off in --serve mode rather than one-shot runs.
+LSTM_XLA = os.getenv('LSTM_XLA', 'False').lower() == 'true'
+
+# LSTM inference engine: 'auto' (ONNX Runtime, then TFLite, then Keras - first one
+# whose export exists), or force 'onnx', 'tflite' or 'keras'. A forced engine that
+# cannot be loaded falls back to Keras with a warning.
+LSTM_BACKEND = os.getenv('LSTM_BACKEND', 'auto').lower()
+
+# Number of recent LSTM input windows whose forecasts are kept in memory (0 disables)
+LSTM_PREDICTION_CACHE_SIZE = int(os.getenv('LSTM_PREDICTION_CACHE_SIZE', 128))
+
 # Logging configuration
 VERBOSE_LOGGING = os.getenv('VERBOSE_LOGGING', 'False').lower() == 'true'
 
@@ -12,6 +12,8 @@ All business logic has been extracted to organized modules:
 
 Usage:
     python forecast_7day_service.py <lat> <lng>
+    python forecast_7day_service.py '[{"lat": 5.97, "lng": 80.43}, ...]'   # batched, JSON list out
+    python forecast_7day_service.py --serve   # one JSON request per stdin line
     
 Example:
     python forecast_7day_service.py 5.9721 80.4264
@@ -1,19 +1,27 @@
 """Python package initialization for models module"""
 from .random_forest import (
     load_random_forest_model,
-    predict_with_random_forest
+    predict_with_random_forest,
+    warmup_random_forest_model
 )
 from .lstm import (
     load_lstm_model,
-    predict_with_lstm
+    clear_forecast_cache,
+    predict_with_lstm,
+    predict_with_lstm_batch,
+    warmup_lstm_model
 )
 
 __all__ = [
     # Random Forest
     'load_random_forest_model',
     'predict_with_random_forest',
+    'warmup_random_forest_model',
     
     # LSTM
     'load_lstm_model',
-    'predict_with_lstm'
+    'clear_forecast_cache',
+    'predict_with_lstm',
+    'predict_with_lstm_batch',
+    'warmup_lstm_model'
 ]
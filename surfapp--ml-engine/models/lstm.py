@@ -1,38 +1,193 @@
 """LSTM Model Wrapper"""
 import sys
 import os
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
 from config import (
     LSTM_MODEL,
     LSTM_SCALER_X,
     LSTM_SCALER_Y,
+    LSTM_SCALER_PARAMS,
     LSTM_FEATURE_NAMES,
+    LSTM_ONNX_MODEL,
+    LSTM_TFLITE_MODEL,
+    INFERENCE_THREADS,
+    LSTM_PRECISION,
+    LSTM_XLA,
+    LSTM_BACKEND,
+    LSTM_PREDICTION_CACHE_SIZE,
     validate_model_exists
 )
 
-# Try to import TensorFlow/Keras
-try:
-    from tensorflow import keras
-    KERAS_AVAILABLE = True
-except ImportError:
-    KERAS_AVAILABLE = False
-    print("Warning: TensorFlow/Keras not available. LSTM model cannot be loaded.", file=sys.stderr)
-
-# Try to import joblib for scalers
-try:
-    import joblib
-    JOBLIB_AVAILABLE = True
-except ImportError:
-    JOBLIB_AVAILABLE = False
-    print("Warning: joblib not available. LSTM scalers cannot be loaded.", file=sys.stderr)
+# CPU inference tuning; must be in the environment before TensorFlow is imported.
+# setdefault keeps any value already exported by the deployment.
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+os.environ.setdefault('OMP_NUM_THREADS', str(INFERENCE_THREADS))
+
+# TensorFlow/Keras, joblib and ONNX Runtime are imported on first use
+# (see _import_backends) so mock/extrapolation-only runs never pay for them.
+# The *_AVAILABLE flags stay None until an import has been attempted.
+tf = None
+keras = None
+joblib = None
+ort = None
+KERAS_AVAILABLE = None
+JOBLIB_AVAILABLE = None
+ONNXRUNTIME_AVAILABLE = None
+
+
+def _import_backends():
+    """
+    Import TensorFlow/Keras and joblib on first call.
+    
+    Returns:
+        bool: True if both are available
+    """
+    global tf, keras, joblib, KERAS_AVAILABLE, JOBLIB_AVAILABLE
+    
+    if KERAS_AVAILABLE is None:
+        try:
+            import tensorflow as tf
+            from tensorflow import keras
+            KERAS_AVAILABLE = True
+            try:
+                # One model runs at a time: give its ops all cores, no inter-op fan-out
+                tf.config.threading.set_intra_op_parallelism_threads(INFERENCE_THREADS)
+                tf.config.threading.set_inter_op_parallelism_threads(1)
+            except RuntimeError:
+                # TensorFlow was already initialised elsewhere in the process
+                pass
+        except ImportError:
+            KERAS_AVAILABLE = False
+            print("Warning: TensorFlow/Keras not available. LSTM model cannot be loaded.", file=sys.stderr)
+    
+    if JOBLIB_AVAILABLE is None:
+        try:
+            import joblib
+            JOBLIB_AVAILABLE = True
+        except ImportError:
+            JOBLIB_AVAILABLE = False
+            print("Warning: joblib not available. LSTM scalers cannot be loaded.", file=sys.stderr)
+    
+    return KERAS_AVAILABLE and JOBLIB_AVAILABLE
+
+
+def _import_onnxruntime():
+    """Import ONNX Runtime (optional, faster inference engine) on first call"""
+    global ort, ONNXRUNTIME_AVAILABLE
+    
+    if ONNXRUNTIME_AVAILABLE is None:
+        try:
+            import onnxruntime as ort
+            ONNXRUNTIME_AVAILABLE = True
+        except ImportError:
+            ONNXRUNTIME_AVAILABLE = False
+    
+    return ONNXRUNTIME_AVAILABLE
+
+
+# Execution providers in order of preference; only those present in the
+# installed onnxruntime build are used (CPU is always available)
+ONNX_PROVIDER_PREFERENCE = (
+    'TensorrtExecutionProvider',
+    'CUDAExecutionProvider',
+    'CPUExecutionProvider'
+)
 
 # Global model and scaler instances
 _lstm_model = None
+_onnx_session = None
+_onnx_loaded = False
+_tflite_interpreter = None
+_tflite_loaded = False
+_predict_fn = None
+_predict_fn_model = None
+_fused_fn = None
+_fused_fn_key = None
+_affine_cache = {}
+# Per-thread input buffer for _scale_input, so concurrent callers never share one
+_scale_scratch = threading.local()
 _scaler_x = None
 _scaler_y = None
 _feature_names = None
 _models_loaded = False
 
+# Serializes first-time loading when forecasts run on several threads (serve mode).
+# Re-entrant because load_lstm_model warms the model, which calls the other loaders.
+_load_lock = threading.RLock()
+
+# LRU of recent predictions, keyed on model/scalers and a digest of the input window.
+# Guarded by its own lock since serve mode answers requests on several threads.
+PREDICTION_CACHE_SIZE = LSTM_PREDICTION_CACHE_SIZE
+_prediction_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# Largest acceptable |mixed - float32| on a probe window, in scaled (standard
+# deviation) units of the outputs
+MIXED_PRECISION_TOLERANCE = 0.05
+
+
+def _to_mixed_precision(model, policy='mixed_float16'):
+    """
+    Rebuild a float32 Keras model with mixed-precision layers (same weights).
+    
+    The last layer stays float32 so outputs keep full precision; inputs are
+    autocast by the layers, so callers can keep feeding float32.
+    """
+    last_layer = model.layers[-1]
+    
+    def clone_layer(layer):
+        config = layer.get_config()
+        if layer is not last_layer:
+            config['dtype'] = policy
+        return layer.__class__.from_config(config)
+    
+    mixed = keras.models.clone_model(model, clone_function=clone_layer)
+    mixed.set_weights(model.get_weights())
+    return mixed
+
+
+def _precision_drift(reference, candidate):
+    """Max abs output difference between two models on a fixed scaled-input probe"""
+    probe = np.random.default_rng(0).standard_normal((1, 168, 6)).astype(np.float32)
+    expected = reference(probe, training=False)
+    actual = candidate(probe, training=False)
+    return float(np.max(np.abs(np.asarray(actual, dtype=np.float32) - np.asarray(expected, dtype=np.float32))))
+
+
+def _to_unrolled(model):
+    """
+    Rebuild the model with unroll=True on its LSTM layers (same weights).
+    
+    With a fixed 168-step input the unrolled recurrence lets XLA fuse across
+    timesteps instead of running a step-by-step while loop.
+    """
+    def clone_layer(layer):
+        config = layer.get_config()
+        if isinstance(layer, keras.layers.LSTM):
+            config['unroll'] = True
+        return layer.__class__.from_config(config)
+    
+    unrolled = keras.models.clone_model(model, clone_function=clone_layer)
+    unrolled.set_weights(model.get_weights())
+    return unrolled
+
+
+def _check_cudnn_eligible(model):
+    """Warn if an LSTM layer cannot use the fused CuDNN kernel on GPU"""
+    for layer in model.layers:
+        if not isinstance(layer, keras.layers.LSTM):
+            continue
+        config = layer.get_config()
+        if (config.get('activation') != 'tanh'
+                or config.get('recurrent_activation') != 'sigmoid'
+                or config.get('recurrent_dropout', 0.0) != 0.0
+                or not config.get('use_bias', True)):
+            print(f"⚠️  LSTM layer '{layer.name}' is not CuDNN-eligible; GPU will use the generic kernel", file=sys.stderr)
+
 
 def load_lstm_model():
     """
@@ -41,47 +196,76 @@ def load_lstm_model():
     Returns:
         tuple: (model, scaler_X, scaler_y, feature_names) or (None, None, None, None)
     """
+    if _models_loaded:
+        return _lstm_model, _scaler_x, _scaler_y, _feature_names
+    
+    with _load_lock:
+        return _load_lstm_model_locked()
+
+
+def _load_lstm_model_locked():
+    """Body of load_lstm_model; runs under _load_lock, so at most once"""
     global _lstm_model, _scaler_x, _scaler_y, _feature_names, _models_loaded
     
     if _models_loaded:
         return _lstm_model, _scaler_x, _scaler_y, _feature_names
     
+    # Check the artifacts first: no point importing TensorFlow if they are missing.
+    # The .npz scaler parameters replace both pickled scalers when present.
+    scaler_params_available = os.path.exists(LSTM_SCALER_PARAMS)
+    if not (validate_model_exists(LSTM_MODEL, "LSTM Model")
+            and (scaler_params_available
+                 or (validate_model_exists(LSTM_SCALER_X, "LSTM Scaler X")
+                     and validate_model_exists(LSTM_SCALER_Y, "LSTM Scaler Y")))):
+        _models_loaded = True
+        return None, None, None, None
+    
+    _import_backends()
+    
     if not KERAS_AVAILABLE:
         print("❌ Cannot load LSTM: TensorFlow/Keras not available", file=sys.stderr)
         _models_loaded = True
         return None, None, None, None
     
-    if not JOBLIB_AVAILABLE:
+    if not JOBLIB_AVAILABLE and not scaler_params_available:
         print("❌ Cannot load LSTM: joblib not available (needed for scalers)", file=sys.stderr)
         _models_loaded = True
         return None, None, None, None
     
     try:
         # Load LSTM model
-        if not validate_model_exists(LSTM_MODEL, "LSTM Model"):
-            _models_loaded = True
-            return None, None, None, None
-        
         print(f"Loading LSTM model from {LSTM_MODEL}...", file=sys.stderr)
         _lstm_model = keras.models.load_model(LSTM_MODEL)
         print("✅ LSTM model loaded", file=sys.stderr)
         
-        # Load scalers
-        if not validate_model_exists(LSTM_SCALER_X, "LSTM Scaler X"):
-            _models_loaded = True
-            return None, None, None, None
+        _check_cudnn_eligible(_lstm_model)
+        
+        if LSTM_XLA:
+            _lstm_model = _to_unrolled(_lstm_model)
+            print("✅ LSTM layers unrolled for XLA", file=sys.stderr)
         
-        if not validate_model_exists(LSTM_SCALER_Y, "LSTM Scaler Y"):
-            _models_loaded = True
-            return None, None, None, None
+        if LSTM_PRECISION == 'mixed_float16' and not tf.config.list_physical_devices('GPU'):
+            print("⚠️  mixed_float16 requested but no GPU found, keeping float32", file=sys.stderr)
+        elif LSTM_PRECISION in ('mixed_float16', 'mixed_bfloat16'):
+            mixed = _to_mixed_precision(_lstm_model, LSTM_PRECISION)
+            drift = _precision_drift(_lstm_model, mixed)
+            if drift <= MIXED_PRECISION_TOLERANCE:
+                _lstm_model = mixed
+                print(f"✅ LSTM converted to {LSTM_PRECISION} (max drift {drift:.2e})", file=sys.stderr)
+            else:
+                print(f"⚠️  {LSTM_PRECISION} drifts {drift:.2e} from float32, keeping float32", file=sys.stderr)
         
+        # Load scalers: plain arrays if exported, otherwise the pickled sklearn objects
         print("Loading LSTM scalers...", file=sys.stderr)
-        _scaler_x = joblib.load(LSTM_SCALER_X)
-        _scaler_y = joblib.load(LSTM_SCALER_Y)
+        if scaler_params_available:
+            _scaler_x, _scaler_y = load_scaler_params(LSTM_SCALER_PARAMS)
+        else:
+            _scaler_x = joblib.load(LSTM_SCALER_X)
+            _scaler_y = joblib.load(LSTM_SCALER_Y)
         print("✅ LSTM scalers loaded", file=sys.stderr)
         
         # Load feature names (optional)
-        if os.path.exists(LSTM_FEATURE_NAMES):
+        if JOBLIB_AVAILABLE and os.path.exists(LSTM_FEATURE_NAMES):
             try:
                 _feature_names = joblib.load(LSTM_FEATURE_NAMES)
                 print(f"✅ Feature names loaded: {_feature_names}", file=sys.stderr)
@@ -90,6 +274,11 @@ def load_lstm_model():
                 _feature_names = None
         
         _models_loaded = True
+        
+        # XLA compiles on first call; do it now rather than on the first request
+        if LSTM_XLA:
+            warmup_lstm_model()
+        
         return _lstm_model, _scaler_x, _scaler_y, _feature_names
         
     except Exception as e:
@@ -100,18 +289,406 @@ def load_lstm_model():
         return None, None, None, None
 
 
-def predict_with_lstm(recent_data, model=None, scaler_x=None, scaler_y=None):
+def _backend_allowed(backend, export_path):
+    """True if LSTM_BACKEND permits `backend` and its exported model file exists"""
+    if LSTM_BACKEND not in ('auto', backend):
+        return False
+    if not os.path.exists(export_path):
+        if LSTM_BACKEND == backend:
+            print(f"⚠️  LSTM_BACKEND={backend} but {export_path} is missing, using Keras", file=sys.stderr)
+        return False
+    return True
+
+
+def load_lstm_onnx_session():
     """
-    Use LSTM model to predict future 168 hours (7 days).
+    Load the ONNX export of the LSTM model, if present.
+
+    Returns:
+        onnxruntime.InferenceSession or None if unavailable
+    """
+    global _onnx_session, _onnx_loaded
+
+    if _onnx_loaded:
+        return _onnx_session
+
+    with _load_lock:
+        if not _onnx_loaded and _backend_allowed('onnx', LSTM_ONNX_MODEL) and _import_onnxruntime():
+            try:
+                available = set(ort.get_available_providers())
+                providers = [p for p in ONNX_PROVIDER_PREFERENCE if p in available]
+                _onnx_session = ort.InferenceSession(LSTM_ONNX_MODEL, providers=providers)
+                print(f"✅ LSTM ONNX engine loaded ({_onnx_session.get_providers()[0]})", file=sys.stderr)
+            except Exception as e:
+                print(f"⚠️  Could not load ONNX model, using Keras: {e}", file=sys.stderr)
+                _onnx_session = None
+        _onnx_loaded = True
+
+    return _onnx_session
+
+
+def _get_predict_fn(model):
+    """
+    Build (once per model) a graph-compiled forward pass.
+
+    model.predict() sets up a tf.data pipeline and callbacks on every call;
+    a tf.function with a fixed input signature is traced once and reused.
+    The concrete function is returned so calls also skip tf.function's
+    per-call argument matching; pass it a float32 tensor.
+    """
+    global _predict_fn, _predict_fn_model
+
+    if _predict_fn is None or _predict_fn_model is not model:
+        @tf.function(input_signature=[tf.TensorSpec((None, 168, 6), tf.float32)], jit_compile=LSTM_XLA)
+        def predict_fn(x):
+            return model(x, training=False)
+
+        _predict_fn = predict_fn.get_concrete_function()
+        _predict_fn_model = model
+
+    return _predict_fn
+
+
+def _get_fused_predict_fn(model, scaler_x, scaler_y):
+    """
+    Build (once per model/scaler set) a tf.function doing scale -> model -> unscale.
+    
+    Takes raw (N, 168, 6) observations and returns real-unit predictions in one
+    graph call. The scalers are folded into a copy of the model's weights when
+    its layout allows (see _fold_scalers), otherwise applied as graph ops around
+    the model; either way nothing crosses the Python/TF boundary.
+    
+    Returns:
+        Concrete function (takes a float32 tensor) or None if either scaler
+        is not a plain affine transform
+    """
+    global _fused_fn, _fused_fn_key
+    
+    key = (id(model), id(scaler_x), id(scaler_y))
+    if _fused_fn is not None and _fused_fn_key == key:
+        return _fused_fn
+    
+    x_coefficients = _affine_coefficients(scaler_x)
+    y_coefficients = _affine_coefficients(scaler_y)
+    if x_coefficients is None or y_coefficients is None:
+        return None
+    
+    folded = _fold_scalers(model, x_coefficients, y_coefficients)
+    if folded is not None:
+        # Scalers live in the weights: the graph is just the model
+        @tf.function(input_signature=[tf.TensorSpec((None, 168, 6), tf.float32)], jit_compile=LSTM_XLA)
+        def fused_fn(x):
+            return tf.reshape(folded(x, training=False), (-1, 168, 6))
+    else:
+        mul_x, add_x = (tf.constant(c, tf.float32) for c in x_coefficients[:2])
+        inv_mul_y, inv_add_y = (tf.constant(c, tf.float32) for c in y_coefficients[2:])
+        
+        @tf.function(input_signature=[tf.TensorSpec((None, 168, 6), tf.float32)], jit_compile=LSTM_XLA)
+        def fused_fn(x):
+            y = model(x * mul_x + add_x, training=False)
+            return tf.reshape(y, (-1, 168, 6)) * inv_mul_y + inv_add_y
+    
+    _fused_fn = fused_fn.get_concrete_function()
+    _fused_fn_key = key
+    return _fused_fn
+
+
+def _fold_scalers(model, x_coefficients, y_coefficients):
+    """
+    Clone the model with both affine scalers folded into its weights.
+    
+    The first LSTM only sees its input through x @ kernel, so
+    (x * mul + add) @ kernel + bias == x @ (mul[:, None] * kernel) + (add @ kernel + bias);
+    the output Dense absorbs y * inv_mul + inv_add the same way. The clone maps
+    raw observations to real-unit predictions with no scaling ops at all.
+    
+    Returns:
+        Keras model, or None unless the model is LSTM ... (TimeDistributed) Dense
+        with biases, 6 outputs and a linear activation (the output fold is only
+        exact before any non-linearity)
+    """
+    mul_x, add_x = x_coefficients[:2]
+    inv_mul_y, inv_add_y = y_coefficients[2:]
+    
+    first, last = model.layers[0], model.layers[-1]
+    last_dense = getattr(last, 'layer', last)  # TimeDistributed wraps the Dense
+    first_weights, last_weights = first.get_weights(), last.get_weights()
+    if (not isinstance(first, keras.layers.LSTM) or not isinstance(last_dense, keras.layers.Dense)
+            or last_dense.activation is not keras.activations.linear
+            or len(first_weights) != 3 or len(last_weights) != 2
+            or first_weights[0].shape[0] != len(mul_x) or last_weights[1].shape != inv_mul_y.shape):
+        return None
+    
+    kernel, recurrent_kernel, bias = first_weights
+    out_kernel, out_bias = last_weights
+    
+    folded = keras.models.clone_model(model)
+    folded.set_weights(model.get_weights())
+    folded.layers[0].set_weights([
+        (mul_x[:, None] * kernel).astype(kernel.dtype),
+        recurrent_kernel,
+        (bias + add_x @ kernel).astype(bias.dtype)
+    ])
+    folded.layers[-1].set_weights([
+        (out_kernel * inv_mul_y).astype(out_kernel.dtype),
+        (out_bias * inv_mul_y + inv_add_y).astype(out_bias.dtype)
+    ])
+    print("✅ LSTM scalers folded into the model weights", file=sys.stderr)
+    return folded
+
+
+def load_lstm_tflite_interpreter():
+    """
+    Load the int8 TFLite export of the LSTM model, if present.
+    
+    Uses the standalone tflite_runtime package when installed, otherwise
+    the interpreter bundled with TensorFlow.
+    
+    Returns:
+        Interpreter or None if unavailable
+    """
+    global _tflite_interpreter, _tflite_loaded
+    
+    if _tflite_loaded:
+        return _tflite_interpreter
+    
+    with _load_lock:
+        if not _tflite_loaded and _backend_allowed('tflite', LSTM_TFLITE_MODEL):
+            _tflite_interpreter = _open_tflite_interpreter()
+        _tflite_loaded = True
+    
+    return _tflite_interpreter
+
+
+def _open_tflite_interpreter():
+    """Create and allocate the TFLite interpreter, or None if it cannot be loaded"""
+    try:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            if not _import_backends():
+                return None
+            Interpreter = tf.lite.Interpreter
+        
+        interpreter = Interpreter(model_path=LSTM_TFLITE_MODEL, num_threads=INFERENCE_THREADS)
+        interpreter.allocate_tensors()
+        print("✅ LSTM TFLite (int8) interpreter loaded", file=sys.stderr)
+        return interpreter
+    except Exception as e:
+        print(f"⚠️  Could not load TFLite model, using Keras: {e}", file=sys.stderr)
+        return None
+
+
+def _run_tflite(interpreter, X_input):
+    """
+    Invoke the TFLite interpreter.
+    
+    Exports pin the input to (1, 168, 6) so tensors are allocated once; a batch
+    is then run window by window. Models with a dynamic batch dimension are
+    resized to the batch instead.
+    """
+    input_detail = interpreter.get_input_details()[0]
+    output_index = interpreter.get_output_details()[0]['index']
+    
+    if tuple(input_detail['shape']) == X_input.shape:
+        interpreter.set_tensor(input_detail['index'], X_input)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index)
+    
+    if input_detail.get('shape_signature', input_detail['shape'])[0] == 1:
+        outputs = []
+        for window in X_input:
+            interpreter.set_tensor(input_detail['index'], window[None])
+            interpreter.invoke()
+            outputs.append(interpreter.get_tensor(output_index))
+        return np.concatenate(outputs)
+    
+    interpreter.resize_tensor_input(input_detail['index'], X_input.shape)
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(input_detail['index'], X_input)
+    interpreter.invoke()
+    return interpreter.get_tensor(output_index)
+
+
+def _run_inference(model, X_input):
+    """Run one forward pass: ONNX engine, then int8 TFLite, then Keras"""
+    X_input = np.asarray(X_input, dtype=np.float32)
+    session = load_lstm_onnx_session()
+    if session is not None:
+        input_name = session.get_inputs()[0].name
+        return session.run(None, {input_name: X_input})[0]
+    interpreter = load_lstm_tflite_interpreter()
+    if interpreter is not None:
+        return _run_tflite(interpreter, X_input)
+    return _get_predict_fn(model)(tf.constant(X_input)).numpy()
+
+
+def warmup_lstm_model():
+    """
+    Run one dummy forward pass so graph tracing / engine setup (and the XLA
+    compile when LSTM_XLA is on) happens before the first real request.
+
+    Returns:
+        bool: True if the model ran, False if it is unavailable
+    """
+    model, scaler_x, scaler_y, _ = load_lstm_model()
+    if model is None:
+        return False
+    try:
+        X_dummy = np.zeros((1, 168, 6), dtype=np.float32)
+        fused_fn = None
+        if load_lstm_onnx_session() is None and load_lstm_tflite_interpreter() is None:
+            fused_fn = _get_fused_predict_fn(model, scaler_x, scaler_y)
+        
+        # Warm the function predict_with_lstm_batch will actually call
+        if fused_fn is not None:
+            fused_fn(tf.constant(X_dummy)).numpy()
+        else:
+            _run_inference(model, X_dummy)
+        print("✅ LSTM warmed up", file=sys.stderr)
+        return True
+    except Exception as e:
+        print(f"⚠️  LSTM warmup failed: {e}", file=sys.stderr)
+        return False
+
+
+class ArrayScaler:
+    """
+    StandardScaler stand-in rebuilt from its mean_/scale_ arrays.
+    
+    Loading these from an .npz avoids unpickling the sklearn object (and
+    importing sklearn) at serve time. Exposes the attributes
+    _affine_coefficients reads plus transform/inverse_transform.
+    """
+    
+    with_mean = True
+    with_std = True
+    
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.n_features_in_ = len(self.mean_)
+    
+    def transform(self, X):
+        return (X - self.mean_) / self.scale_
+    
+    def inverse_transform(self, X):
+        return X * self.scale_ + self.mean_
+
+
+def load_scaler_params(path):
+    """
+    Load the input/output scalers saved by training/train_wave_forecast_lstm.py.
+    
+    Returns:
+        tuple: (scaler_x, scaler_y) as ArrayScaler instances
+    """
+    with np.load(path) as params:
+        return (
+            ArrayScaler(params['x_mean'], params['x_scale']),
+            ArrayScaler(params['y_mean'], params['y_scale'])
+        )
+
+
+def _affine_coefficients(scaler):
+    """
+    Reduce a fitted StandardScaler/MinMaxScaler to per-feature (mul, add)
+    arrays so that transform(x) == x * mul + add.
+    
+    Returns:
+        tuple or None: (mul, add, inv_mul, inv_add), None for other scaler types
+    """
+    cached = _affine_cache.get(id(scaler))
+    if cached is not None and cached[0] is scaler:
+        return cached[1]
+    
+    coefficients = None
+    if hasattr(scaler, 'data_min_') and hasattr(scaler, 'min_'):
+        # MinMaxScaler: x * scale_ + min_
+        mul = np.asarray(scaler.scale_, dtype=np.float64)
+        add = np.asarray(scaler.min_, dtype=np.float64)
+        coefficients = (mul, add)
+    elif hasattr(scaler, 'var_') or hasattr(scaler, 'mean_'):
+        # StandardScaler: (x - mean_) / scale_ (either may be disabled)
+        n_features = scaler.n_features_in_
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+        if getattr(scaler, 'with_mean', True) and getattr(scaler, 'mean_', None) is not None:
+            mean = np.asarray(scaler.mean_, dtype=np.float64)
+        if getattr(scaler, 'with_std', True) and getattr(scaler, 'scale_', None) is not None:
+            scale = np.asarray(scaler.scale_, dtype=np.float64)
+        coefficients = (1.0 / scale, -mean / scale)
+    
+    if coefficients is not None:
+        mul, add = coefficients
+        coefficients = (mul, add, 1.0 / mul, -add / mul)
+    _affine_cache[id(scaler)] = (scaler, coefficients)
+    return coefficients
+
+
+def _scale_input(scaler, X):
+    """scaler.transform for (..., 6) arrays without sklearn's per-call validation"""
+    coefficients = _affine_coefficients(scaler)
+    if coefficients is None:
+        return scaler.transform(X.reshape(-1, X.shape[-1])).reshape(X.shape)
+    mul, add, _, _ = coefficients
+    
+    # Scale in place into a reused float32 buffer (the model input dtype):
+    # no temporaries, no separate astype copy. Only valid until the next call
+    # on the same thread.
+    scratch = getattr(_scale_scratch, 'buffer', None)
+    if scratch is None or scratch.shape != X.shape:
+        scratch = _scale_scratch.buffer = np.empty(X.shape, dtype=np.float32)
+    np.multiply(X, mul, out=scratch, casting='same_kind')
+    scratch += add.astype(np.float32)
+    return scratch
+
+
+def _unscale_output(scaler, y):
+    """
+    scaler.inverse_transform for (..., 6) arrays.
+    
+    Affine scalers are applied in place: `y` is the engine's freshly
+    allocated output, so no 168x6 temporaries are needed.
+    """
+    coefficients = _affine_coefficients(scaler)
+    if coefficients is None:
+        return scaler.inverse_transform(y.reshape(-1, y.shape[-1])).reshape(y.shape)
+    _, _, inv_mul, inv_add = coefficients
+    if not y.flags.writeable or y.dtype.kind != 'f':
+        y = np.array(y, dtype=np.float32)
+    np.multiply(y, inv_mul, out=y, casting='unsafe')
+    np.add(y, inv_add, out=y, casting='unsafe')
+    return y
+
+
+def _fit_to_window(recent_data, out):
+    """
+    Write the last len(out) rows of recent_data into `out`, padding by
+    repeating the last row. Filling the caller's buffer directly replaces a
+    repeat + vstack (and the later stack) with one copy.
+    """
+    n_rows = min(len(recent_data), len(out))
+    if n_rows == 0:
+        raise ValueError("No recent observations to build the input window from")
+    out[:n_rows] = recent_data[-n_rows:]
+    out[n_rows:] = recent_data[-1]
+    return out
+
+
+def predict_with_lstm_batch(recent_batch, model=None, scaler_x=None, scaler_y=None):
+    """
+    Predict the next 168 hours for several locations with a single model call.
+    Windows seen recently are answered from an LRU cache without running the model.
     
     Args:
-        recent_data: np.array of shape (168, 6) with recent observations
+        recent_batch: Sequence of N arrays, each (time_steps, 6) of recent observations
         model: Optional pre-loaded LSTM model
         scaler_x: Optional pre-loaded input scaler
         scaler_y: Optional pre-loaded output scaler
     
     Returns:
-        np.array: Predictions of shape (168, 6) or None if failed
+        np.array: Predictions of shape (N, 168, 6) or None if failed
     """
     # Load models if not provided
     if model is None or scaler_x is None or scaler_y is None:
@@ -122,27 +699,36 @@ def predict_with_lstm(recent_data, model=None, scaler_x=None, scaler_y=None):
         return None
     
     try:
-        # Ensure exactly 168 timesteps
-        if len(recent_data) > 168:
-            recent_data = recent_data[-168:]
-        elif len(recent_data) < 168:
-            # Pad with last value
-            padding = np.repeat(recent_data[-1:], 168 - len(recent_data), axis=0)
-            recent_data = np.vstack([recent_data, padding])
+        # Exactly 168 timesteps per location, written straight into one (N, 168, 6) array
+        X_batch = np.empty((len(recent_batch), 168, 6))
+        for window, recent_data in zip(X_batch, recent_batch):
+            _fit_to_window(np.asarray(recent_data), window)
         
-        # Scale input
-        X_scaled = scaler_x.transform(recent_data)
-        X_input = X_scaled.reshape(1, 168, 6)
+        # Only windows not seen recently go through the model
+        keys = [_prediction_key(model, scaler_x, scaler_y, window) for window in X_batch]
+        misses = []
         
-        # Predict (168 hours, 6 features)
-        print("  Running LSTM prediction...", file=sys.stderr)
-        y_pred_scaled = model.predict(X_input, verbose=0)
+        y_pred = np.empty((len(X_batch), 168, 6))
+        with _cache_lock:
+            for i, key in enumerate(keys):
+                cached = _prediction_cache.get(key)
+                if cached is None:
+                    misses.append(i)
+                else:
+                    _prediction_cache.move_to_end(key)
+                    y_pred[i] = cached
         
-        # Inverse transform to get real values
-        y_pred_flat = y_pred_scaled.reshape(-1, 6)
-        y_pred = scaler_y.inverse_transform(y_pred_flat).reshape(168, 6)
+        if not misses:
+            print(f"✅ LSTM prediction served from cache ({len(keys)} location(s))", file=sys.stderr)
+            return y_pred
+        
+        y_pred[misses] = _predict_windows(model, scaler_x, scaler_y, X_batch[misses])
+        with _cache_lock:
+            for i in misses:
+                _prediction_cache[keys[i]] = y_pred[i].copy()
+            while len(_prediction_cache) > PREDICTION_CACHE_SIZE:
+                _prediction_cache.popitem(last=False)
         
-        print("✅ LSTM prediction complete", file=sys.stderr)
         return y_pred
         
     except Exception as e:
@@ -152,6 +738,62 @@ def predict_with_lstm(recent_data, model=None, scaler_x=None, scaler_y=None):
         return None
 
 
+def _prediction_key(model, scaler_x, scaler_y, window):
+    """Cache key for one (168, 6) input window"""
+    digest = hashlib.blake2b(np.ascontiguousarray(window).tobytes(), digest_size=16).digest()
+    return id(model), id(scaler_x), id(scaler_y), window.dtype.str, digest
+
+
+def _predict_windows(model, scaler_x, scaler_y, X_batch):
+    """Scale, run and unscale a stacked (N, 168, 6) batch of input windows"""
+    n_locations = len(X_batch)
+    
+    print(f"  Running LSTM prediction ({n_locations} location(s))...", file=sys.stderr)
+    
+    # Keras path: scaling + model + inverse scaling in a single graph call
+    fused_fn = None
+    if load_lstm_onnx_session() is None and load_lstm_tflite_interpreter() is None:
+        fused_fn = _get_fused_predict_fn(model, scaler_x, scaler_y)
+    
+    if fused_fn is not None:
+        y_pred = fused_fn(tf.constant(X_batch, dtype=tf.float32)).numpy()
+    else:
+        # Scale input
+        X_input = _scale_input(scaler_x, X_batch)
+        
+        # Predict (N locations, 168 hours, 6 features)
+        y_pred_scaled = _run_inference(model, X_input)
+        
+        # Inverse transform to get real values
+        y_pred = _unscale_output(scaler_y, y_pred_scaled.reshape(n_locations, 168, 6))
+    
+    print("✅ LSTM prediction complete", file=sys.stderr)
+    return y_pred
+
+
+def clear_forecast_cache():
+    """Drop all memoized LSTM predictions"""
+    with _cache_lock:
+        _prediction_cache.clear()
+
+
+def predict_with_lstm(recent_data, model=None, scaler_x=None, scaler_y=None):
+    """
+    Use LSTM model to predict future 168 hours (7 days).
+    
+    Args:
+        recent_data: np.array of shape (168, 6) with recent observations
+        model: Optional pre-loaded LSTM model
+        scaler_x: Optional pre-loaded input scaler
+        scaler_y: Optional pre-loaded output scaler
+    
+    Returns:
+        np.array: Predictions of shape (168, 6) or None if failed
+    """
+    y_pred = predict_with_lstm_batch([recent_data], model=model, scaler_x=scaler_x, scaler_y=scaler_y)
+    return None if y_pred is None else y_pred[0]
+
+
 def get_model_info():
     """Get information about loaded LSTM model"""
     model, scaler_x, scaler_y, feature_names = load_lstm_model()
@@ -1,7 +1,15 @@
 """Random Forest Model Wrapper"""
 import sys
 import os
-from config import RANDOM_FOREST_MODEL, validate_model_exists
+import warnings
+import numpy as np
+from config import (
+    RANDOM_FOREST_MODEL,
+    RANDOM_FOREST_ONNX_MODEL,
+    RANDOM_FOREST_ALL_FEATURES,
+    INFERENCE_THREADS,
+    validate_model_exists
+)
 
 # Try to import joblib
 try:
@@ -14,6 +22,11 @@ except ImportError:
 # Global model instance
 _model_instance = None
 _model_loaded = False
+_onnx_session = None
+_onnx_loaded = False
+# Input name and training column order of the ONNX graph, read once at load
+_onnx_input_name = None
+_onnx_columns = None
 
 
 def load_random_forest_model():
@@ -40,7 +53,10 @@ def load_random_forest_model():
     
     try:
         print(f"Loading Random Forest model from {RANDOM_FOREST_MODEL}...", file=sys.stderr)
-        model_data = joblib.load(RANDOM_FOREST_MODEL)
+        # Memory-map the tree arrays instead of reading them into temporary buffers:
+        # each Tree copies its nodes into its own storage on unpickle anyway, so
+        # this only cuts load time and peak memory. Needs an uncompressed dump.
+        model_data = joblib.load(RANDOM_FOREST_MODEL, mmap_mode='r')
         
         # Extract model from dictionary structure
         if isinstance(model_data, dict):
@@ -52,6 +68,11 @@ def load_random_forest_model():
         else:
             _model_instance = model_data
         
+        # Trees are evaluated in parallel at predict time with the model's own
+        # n_jobs, which is whatever training used; match the serving host instead
+        if hasattr(_model_instance, 'n_jobs'):
+            _model_instance.n_jobs = INFERENCE_THREADS
+        
         print("✅ Random Forest model loaded successfully", file=sys.stderr)
         _model_loaded = True
         return _model_instance
@@ -62,12 +83,68 @@ def load_random_forest_model():
         return None
 
 
+def load_random_forest_onnx_session():
+    """
+    Load the ONNX export of the Random Forest, if present and up to date.
+    
+    An export older than the joblib model is ignored (the model was retrained
+    since), as is a missing onnxruntime; sklearn is used in both cases.
+    
+    Returns:
+        onnxruntime.InferenceSession or None if unavailable
+    """
+    global _onnx_session, _onnx_loaded, _onnx_input_name, _onnx_columns
+    
+    if _onnx_loaded:
+        return _onnx_session
+    _onnx_loaded = True
+    
+    if not os.path.exists(RANDOM_FOREST_ONNX_MODEL):
+        return None
+    
+    if (os.path.exists(RANDOM_FOREST_MODEL)
+            and os.path.getmtime(RANDOM_FOREST_ONNX_MODEL) < os.path.getmtime(RANDOM_FOREST_MODEL)):
+        print("⚠️  Random Forest ONNX export is older than the model, using sklearn", file=sys.stderr)
+        return None
+    
+    try:
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = INFERENCE_THREADS
+        _onnx_session = ort.InferenceSession(RANDOM_FOREST_ONNX_MODEL, sess_options=options,
+                                             providers=['CPUExecutionProvider'])
+        _onnx_input_name = _onnx_session.get_inputs()[0].name
+        # The ONNX graph has no feature names: the export script records the
+        # training column order in the metadata
+        names = _onnx_session.get_modelmeta().custom_metadata_map.get('feature_names')
+        _onnx_columns = names.split(',') if names else RANDOM_FOREST_ALL_FEATURES
+        print("✅ Random Forest ONNX engine loaded", file=sys.stderr)
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"⚠️  Could not load Random Forest ONNX model, using sklearn: {e}", file=sys.stderr)
+        _onnx_session = None
+    
+    return _onnx_session
+
+
+def _predict_with_onnx(session, input_features):
+    """Run the ONNX Random Forest on a DataFrame/array of the 15 model features"""
+    if hasattr(input_features, 'columns'):
+        X = input_features[_onnx_columns].to_numpy(dtype=np.float32)
+    else:
+        # build_feature_matrix output is already contiguous float32: no copy
+        X = np.ascontiguousarray(input_features, dtype=np.float32)
+    return session.run(None, {_onnx_input_name: X})[0]
+
+
 def predict_with_random_forest(input_features, model=None):
     """
     Make prediction using Random Forest model.
     
     Args:
-        input_features: DataFrame with 15 features (10 base + 5 engineered)
+        input_features: DataFrame with 15 features (10 base + 5 engineered), or an
+                        (N, 15) array in RANDOM_FOREST_ALL_FEATURES order
         model: Optional pre-loaded model (will load if None)
     
     Returns:
@@ -80,14 +157,44 @@ def predict_with_random_forest(input_features, model=None):
         raise ValueError("Random Forest model not available")
     
     try:
-        predictions = model.predict(input_features)
-        return predictions
+        session = load_random_forest_onnx_session()
+        if session is not None:
+            return _predict_with_onnx(session, input_features)
+        
+        if hasattr(input_features, 'columns'):
+            return model.predict(input_features)
+        
+        # The model was fitted on a DataFrame; a bare array in the same column
+        # order is fine, so silence sklearn's missing-feature-names warning
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            return model.predict(input_features)
         
     except Exception as e:
         print(f"❌ Random Forest prediction failed: {e}", file=sys.stderr)
         raise
 
 
+def warmup_random_forest_model():
+    """
+    Run one dummy prediction so engine setup (ONNX Runtime session, sklearn's
+    thread pool) happens before the first real request.
+    
+    Returns:
+        bool: True if the model ran, False if it is unavailable
+    """
+    model = load_random_forest_model()
+    if model is None:
+        return False
+    try:
+        predict_with_random_forest(np.zeros((1, len(RANDOM_FOREST_ALL_FEATURES)), dtype=np.float32), model=model)
+        print("✅ Random Forest warmed up", file=sys.stderr)
+        return True
+    except Exception as e:
+        print(f"⚠️  Random Forest warmup failed: {e}", file=sys.stderr)
+        return False
+
+
 def get_model_info():
     """Get information about loaded Random Forest model"""
     model = load_random_forest_model()
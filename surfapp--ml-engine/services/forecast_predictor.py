@@ -1,113 +1,311 @@
 """7-Day Forecast Service - Main Production Service"""
 import sys
 import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+
+# orjson (optional) parses serve-mode request lines faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 from datetime import datetime, timedelta, timezone
 
 # Import from organized modules
 from config import LSTM_FEATURE_COLUMNS
-from models import load_lstm_model, predict_with_lstm
+from models import load_lstm_model, predict_with_lstm_batch, warmup_lstm_model
 from utils import (
     fetch_historical_data_with_rotation,
+    enable_background_refresh,
     generate_mock_timeseries_data,
     generate_forecast_from_trend_extrapolation,
     generate_date_labels,
     aggregate_hourly_to_daily,
-    get_current_timestamp_iso
+    get_current_timestamp_iso,
+    write_json
 )
 
-# --- Load LSTM Model ---
-lstm_model, scaler_x, scaler_y, feature_names = load_lstm_model()
-MODEL_AVAILABLE = (lstm_model is not None and scaler_x is not None and scaler_y is not None)
+# Upper bound on simultaneous StormGlass fetches for batched requests
+MAX_CONCURRENT_FETCHES = 4
 
+# Finished forecasts keyed by (lat, lng rounded to 3 dp, UTC hour). Within the
+# same hour the inputs barely change, so repeat requests in --serve mode skip
+# the fetch and the model entirely. Only LSTM forecasts from API data are kept:
+# a mock/extrapolated fallback after a transient failure is recomputed next time.
+FORECAST_CACHE_SIZE = 64
+_forecast_cache = OrderedDict()
 
-def predict_7day_forecast(lat, lng):
+# --- LSTM Model ---
+# Loaded on first prediction (not at import) so TensorFlow is only imported
+# when the model artifacts exist and a forecast is actually requested.
+
+
+def _lstm_available():
+    """Load the LSTM once (cached in models.lstm) and report whether it is usable"""
+    lstm_model, scaler_x, scaler_y, _ = load_lstm_model()
+    return lstm_model is not None and scaler_x is not None and scaler_y is not None
+
+
+def _load_recent_data(lat, lng):
     """
-    Generate 7-day (168 hour) forecast for a location.
-    
-    Args:
-        lat: Latitude
-        lng: Longitude
+    Fetch the last 168 hours of observations, falling back to mock data.
     
     Returns:
-        tuple: (hourly_forecast, daily_forecast, data_source, method)
-               hourly_forecast: List of 168 hourly dictionaries
-               daily_forecast: List of 7 daily dictionaries
-               data_source: 'api' or 'mock'
-               method: 'lstm' or 'extrapolation' or 'mock'
+        tuple: (recent_data, data_source) with data_source 'api' or 'mock'
     """
-    print(f"\\n🌊 Generating 7-day forecast for ({lat:.3f}, {lng:.3f})...", file=sys.stderr)
-    
-    # Step 1: Try to fetch real historical data (168 hours)
     recent_data = fetch_historical_data_with_rotation(
         lat, lng,
         hours=168,
         feature_names=LSTM_FEATURE_COLUMNS
     )
     
-    # Step 2: Fallback to mock data if API fails
     if recent_data is None:
         print("  Using mock historical data...", file=sys.stderr)
-        recent_data = generate_mock_timeseries_data(lat, lng, hours=168)
-        data_source = 'mock'
+        return generate_mock_timeseries_data(lat, lng, hours=168), 'mock'
+    
+    print(f"  Got {len(recent_data)} hours of historical data from API", file=sys.stderr)
+    return recent_data, 'api'
+
+
+def _format_forecast(future_prediction):
+    """
+    Convert a (168, 6) prediction array into hourly and daily dictionaries.
+    
+    Returns:
+        tuple: (hourly_forecast, daily_forecast)
+    """
+    future_prediction = np.round(np.asarray(future_prediction, dtype=float)[:168], 1)
+    
+    # One tolist() converts every value to a Python float in C
+    hourly_forecast = [
+        {
+            'hour': hour_idx,
+            'day': hour_idx // 24,  # 0-6 for 7 days
+            'hourOfDay': hour_idx % 24,  # 0-23 for hours
+            'waveHeight': wave_height,
+            'wavePeriod': wave_period,
+            'swellHeight': swell_height,
+            'swellPeriod': swell_period,
+            'windSpeed': wind_speed,
+            'windDirection': wind_direction
+        }
+        for hour_idx, (wave_height, wave_period, swell_height, swell_period, wind_speed, wind_direction)
+        in enumerate(future_prediction.tolist())
+    ]
+    
+    # Aggregate to daily averages
+    daily_forecast = aggregate_hourly_to_daily(future_prediction, hours_per_day=24, as_columns=True)
+    
+    return hourly_forecast, daily_forecast
+
+
+def predict_7day_forecast_batch(locations):
+    """
+    Generate 7-day forecasts for several locations with one LSTM call.
+    API-backed LSTM results are reused for the rest of the UTC hour (see _forecast_cache).
+    
+    Args:
+        locations: List of (lat, lng) tuples
+    
+    Returns:
+        list: One (hourly_forecast, daily_forecast, data_source, method) tuple per location
+    """
+    hour_bucket = int(time.time() // 3600)
+    keys = [(round(lat, 3), round(lng, 3), hour_bucket) for lat, lng in locations]
+    
+    misses = list(dict.fromkeys(key for key in keys if key not in _forecast_cache))
+    if len(misses) < len(keys):
+        print(f"  {len(keys) - len(misses)} forecast(s) served from this hour's cache", file=sys.stderr)
+    
+    computed = {}
+    if misses:
+        computed = dict(zip(misses, _compute_forecasts([(lat, lng) for lat, lng, _ in misses])))
+        for key, result in computed.items():
+            _, _, data_source, method = result
+            if data_source == 'api' and method == 'lstm':
+                _forecast_cache[key] = result
+    
+    results = []
+    for key in keys:
+        if key in computed:
+            results.append(computed[key])
+        else:
+            _forecast_cache.move_to_end(key)
+            results.append(_forecast_cache[key])
+    
+    while len(_forecast_cache) > FORECAST_CACHE_SIZE:
+        _forecast_cache.popitem(last=False)
+    
+    return results
+
+
+def _compute_forecasts(locations):
+    """Fetch, predict and format forecasts for `locations` (no caching)"""
+    print(f"\n🌊 Generating 7-day forecast for {len(locations)} location(s)...", file=sys.stderr)
+    
+    # Step 1-2: Real historical data per location, mock fallback if API fails.
+    # Fetches are network-bound, so locations are fetched concurrently.
+    if len(locations) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(locations), MAX_CONCURRENT_FETCHES)) as pool:
+            recents = list(pool.map(lambda loc: _load_recent_data(*loc), locations))
     else:
-        data_source = 'api'
-        print(f"  Got {len(recent_data)} hours of historical data from API", file=sys.stderr)
-    
-    # Step 3: Predict future 168 hours
-    if MODEL_AVAILABLE:
-        # Try LSTM prediction
-        future_prediction = predict_with_lstm(
-            recent_data,
-            model=lstm_model,
-            scaler_x=scaler_x,
-            scaler_y=scaler_y
-        )
-        
-        if future_prediction is not None:
-            method = 'lstm'
+        recents = [_load_recent_data(lat, lng) for lat, lng in locations]
+    
+    # Step 3: Predict future 168 hours for all locations at once
+    predictions = None
+    if _lstm_available():
+        predictions = predict_with_lstm_batch([recent_data for recent_data, _ in recents])
+        if predictions is not None:
             print("  ✅ LSTM prediction successful", file=sys.stderr)
         else:
-            # Fallback to extrapolation
-            method = 'extrapolation'
             print("  Using trend extrapolation...", file=sys.stderr)
-            future_prediction = generate_forecast_from_trend_extrapolation(recent_data, hours_ahead=168)
     else:
-        # No model available, use extrapolation
-        method = 'extrapolation'
         print("  Using trend extrapolation (LSTM not available)...", file=sys.stderr)
-        future_prediction = generate_forecast_from_trend_extrapolation(recent_data, hours_ahead=168)
-    
-    # Step 4: Convert predictions to structured format
-    hourly_forecast = []
-    for hour_idx in range(168):
-        hour_data = future_prediction[hour_idx]
-        day = hour_idx // 24  # 0-6 for 7 days
-        hour_of_day = hour_idx % 24  # 0-23 for hours
+    
+    # Step 4-5: Structured hourly + daily output per location
+    results = []
+    for i, (recent_data, data_source) in enumerate(recents):
+        if predictions is not None:
+            future_prediction, method = predictions[i], 'lstm'
+        else:
+            future_prediction = generate_forecast_from_trend_extrapolation(recent_data, hours_ahead=168)
+            method = 'extrapolation'
         
-        hourly_forecast.append({
-            'hour': hour_idx,
-            'day': day,
-            'hourOfDay': hour_of_day,
-            'waveHeight': round(float(hour_data[0]), 1),
-            'wavePeriod': round(float(hour_data[1]), 1),
-            'swellHeight': round(float(hour_data[2]), 1),
-            'swellPeriod': round(float(hour_data[3]), 1),
-            'windSpeed': round(float(hour_data[4]), 1),
-            'windDirection': round(float(hour_data[5]), 1)
-        })
+        hourly_forecast, daily_forecast = _format_forecast(future_prediction)
+        results.append((hourly_forecast, daily_forecast, data_source, method))
     
-    # Step 5: Aggregate to daily averages
-    daily_forecast = aggregate_hourly_to_daily(hourly_forecast, hours_per_day=24)
+    return results
+
+
+def predict_7day_forecast(lat, lng):
+    """
+    Generate 7-day (168 hour) forecast for a location.
+    
+    Args:
+        lat: Latitude
+        lng: Longitude
+    
+    Returns:
+        tuple: (hourly_forecast, daily_forecast, data_source, method)
+               hourly_forecast: List of 168 hourly dictionaries
+               daily_forecast: Dict of 7 daily values per field
+               data_source: 'api' or 'mock'
+               method: 'lstm' or 'extrapolation' or 'mock'
+    """
+    return predict_7day_forecast_batch([(lat, lng)])[0]
+
+
+def build_forecast_response(lat, lng):
+    """
+    Run the full forecast pipeline and format the JSON payload returned to Node.js.
+    
+    Args:
+        lat: Latitude
+        lng: Longitude
+    
+    Returns:
+        dict: Response with location, labels, daily, hourly and metadata keys
+    """
+    return _format_response(lat, lng, predict_7day_forecast(lat, lng))
+
+
+def build_batch_forecast_response(locations):
+    """
+    Batched variant of build_forecast_response.
+    
+    Args:
+        locations: List of {"lat": ..., "lng": ...} dictionaries
+    
+    Returns:
+        list: One response dictionary per location, in input order
+    """
+    coords = [(float(loc['lat']), float(loc['lng'])) for loc in locations]
+    forecasts = predict_7day_forecast_batch(coords)
+    return [_format_response(lat, lng, forecast) for (lat, lng), forecast in zip(coords, forecasts)]
+
+
+def _format_response(lat, lng, forecast):
+    """Shape one (hourly, daily, data_source, method) tuple into the JSON payload"""
+    hourly_forecast, daily_forecast, data_source, method = forecast
     
-    return hourly_forecast, daily_forecast, data_source, method
+    # Generate date labels
+    date_labels = generate_date_labels(days=7)
+    
+    # Format output
+    return {
+        'location': {'lat': lat, 'lng': lng},
+        'labels': date_labels,
+        'daily': daily_forecast,
+        'hourly': hourly_forecast,
+        'metadata': {
+            'dataSource': data_source,
+            'forecastMethod': method,
+            'generatedAt': get_current_timestamp_iso(),
+            'totalHours': len(hourly_forecast)
+        }
+    }
+
+
+def serve():
+    """
+    Long-lived mode: keep the model loaded and answer one request per stdin line.
+    
+    Each input line is a JSON object {"lat": ..., "lng": ...}, or a JSON list of
+    them to forecast several spots together (concurrent fetches, one model call).
+    A {"ready": true} line is written first, once the model is loaded.
+    Each reply is one compact JSON line on stdout: a forecast, a list of
+    forecasts in input order, or {"error": ...}.
+    """
+    warmup_lstm_model()
+    
+    # The process outlives each reply, so stale cache entries can be refreshed behind it
+    enable_background_refresh()
+    print("✅ Forecast service ready", file=sys.stderr)
+    # Handshake line: the backend starts request timeouts only after this
+    write_json({'ready': True})
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        
+        request = {}
+        try:
+            request = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+            if isinstance(request, list):
+                response = build_batch_forecast_response(request)
+            else:
+                response = build_forecast_response(float(request['lat']), float(request['lng']))
+        except Exception as e:
+            response = {
+                'error': f'Forecast generation failed: {str(e)}',
+                'location': {'lat': request.get('lat'), 'lng': request.get('lng')} if isinstance(request, dict) else None
+            }
+        
+        write_json(response)
 
 
 def main():
     """CLI entry point - maintains backward compatibility"""
+    if len(sys.argv) >= 2 and sys.argv[1] == '--serve':
+        serve()
+        return
+    
+    if len(sys.argv) == 2 and sys.argv[1].lstrip().startswith('['):
+        # Batched: '[{"lat": ..., "lng": ...}, ...]' -> JSON list of forecasts
+        try:
+            write_json(build_batch_forecast_response(json.loads(sys.argv[1])))
+        except Exception as e:
+            print(json.dumps({'error': f'Forecast generation failed: {str(e)}'}), file=sys.stderr)
+            sys.exit(1)
+        return
+    
     if len(sys.argv) < 3:
         print(json.dumps({
-            'error': 'Usage: python forecast_7day_service.py <lat> <lng>'
+            'error': "Usage: python forecast_7day_service.py <lat> <lng> | '[{\"lat\": .., \"lng\": ..}, ...]' | --serve"
         }), file=sys.stderr)
         sys.exit(1)
     
@@ -115,35 +313,10 @@ def main():
         lat = float(sys.argv[1])
         lng = float(sys.argv[2])
         
-        # Generate forecast
-        hourly_forecast, daily_forecast, data_source, method = predict_7day_forecast(lat, lng)
-        
-        # Generate date labels
-        date_labels = generate_date_labels(days=7)
-        
-        # Format output
-        result = {
-            'location': {'lat': lat, 'lng': lng},
-            'labels': date_labels,
-            'daily': {
-                'waveHeight': [daily_forecast[d]['waveHeight'] for d in range(7)],
-                'wavePeriod': [daily_forecast[d]['wavePeriod'] for d in range(7)],
-                'swellHeight': [daily_forecast[d]['swellHeight'] for d in range(7)],
-                'swellPeriod': [daily_forecast[d]['swellPeriod'] for d in range(7)],
-                'windSpeed': [daily_forecast[d]['windSpeed'] for d in range(7)],
-                'windDirection': [daily_forecast[d]['windDirection'] for d in range(7)]
-            },
-            'hourly': hourly_forecast,
-            'metadata': {
-                'dataSource': data_source,
-                'forecastMethod': method,
-                'generatedAt': get_current_timestamp_iso(),
-                'totalHours': len(hourly_forecast)
-            }
-        }
+        result = build_forecast_response(lat, lng)
         
         # Output JSON
-        print(json.dumps(result, indent=2))
+        write_json(result)
         
     except Exception as e:
         print(json.dumps({
@@ -2,21 +2,23 @@
 import sys
 import json
 import os
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 # Import from organized modules
 from config import (
     USE_MOCK_DATA,
+    SPOT_FETCH_CONCURRENCY,
     RANDOM_FOREST_BASE_FEATURES,
     RANDOM_FOREST_TARGETS
 )
-from models import load_random_forest_model, predict_with_random_forest
+from models import load_random_forest_model, predict_with_random_forest, warmup_random_forest_model
 from utils import (
     fetch_weather_data_with_rotation,
-    calculate_engineered_features,
+    build_feature_matrix,
     sanitize_prediction,
-    generate_mock_spot_forecast
+    generate_mock_spot_forecast,
+    write_json
 )
 
 # --- Load Surf Spots ---
@@ -39,57 +41,110 @@ except Exception as e:
 SURF_PREDICTOR = load_random_forest_model()
 
 
-def run_ml_prediction(features):
+# Returned when the model is unavailable or prediction fails
+DEFAULT_PREDICTION = {
+    'waveHeight': 1.0,
+    'wavePeriod': 10.0,
+    'windSpeed': 15.0,
+    'windDirection': 0,
+    'tide': {'status': 'Mid'}
+}
+
+
+def _format_prediction(features, prediction_row):
+    """Turn one post-processed model output row into the forecast dictionary sent to the backend"""
+    wave_height, wave_period, wind_speed, wind_direction = prediction_row
+    
+    # Extract tide status from sea level
+    sea_level = float(features.get('seaLevel', 0.5))
+    tide_status = 'High' if sea_level > 0.8 else ('Low' if sea_level < 0.3 else 'Mid')
+    
+    result = {
+        'waveHeight': wave_height,
+        'wavePeriod': wave_period,
+        'windSpeed': wind_speed,
+        'windDirection': wind_direction,
+        'tide': {'status': tide_status}
+    }
+    
+    # Sanitize to remove NaN/Inf
+    return sanitize_prediction(result)
+
+
+def run_ml_predictions(features_list):
     """
-    Run ML prediction with feature engineering.
+    Run ML prediction with feature engineering for several spots in one model call.
+    
+    Random Forest prediction cost is dominated by per-call overhead, so all rows
+    go through a single predict() instead of one 1-row call per spot.
     
     Args:
-        features: Dictionary with 10 base weather features
+        features_list: List of dictionaries with 10 base weather features
     
     Returns:
-        dict: Prediction with waveHeight, wavePeriod, windSpeed, windDirection, tide
+        list: One prediction dict (waveHeight, wavePeriod, windSpeed, windDirection, tide) per input
     """
+    if not features_list:
+        return []
+    
     try:
         if not SURF_PREDICTOR:
             raise ValueError("Model not loaded")
         
-        # Create DataFrame from features
-        input_df = pd.DataFrame([features])
+        # One row per spot: 10 base + 5 engineered features (CRITICAL: must match training)
+        X = build_feature_matrix(features_list)
         
-        # Calculate 5 engineered features (CRITICAL: must match training)
-        input_df = calculate_engineered_features(input_df)
+        predictions_array = predict_with_random_forest(X, model=SURF_PREDICTOR)
         
-        # Now we have 15 features (10 base + 5 engineered)
-        predictions_array = predict_with_random_forest(input_df, model=SURF_PREDICTOR)
-        predictions = dict(zip(RANDOM_FOREST_TARGETS, predictions_array[0]))
+        # Unit conversion and rounding for all spots at once; tolist() hands back
+        # plain Python floats, so the per-spot work is just building the dict
+        predictions_array = np.array(predictions_array, dtype=np.float64)
+        predictions_array[:, RANDOM_FOREST_TARGETS.index('windSpeed')] *= 3.6  # m/s to km/h
+        rows = np.round(predictions_array, 1).tolist()
         
-        # Extract tide status from sea level
-        sea_level = float(features.get('seaLevel', 0.5))
-        tide_status = 'High' if sea_level > 0.8 else ('Low' if sea_level < 0.3 else 'Mid')
-        
-        result = {
-            'waveHeight': round(float(predictions.get('waveHeight', 1.0)), 1),
-            'wavePeriod': round(float(predictions.get('wavePeriod', 10.0)), 1),
-            'windSpeed': round(float(predictions.get('windSpeed', 15.0)) * 3.6, 1),  # m/s to km/h
-            'windDirection': round(float(predictions.get('windDirection', 0)), 1),
-            'tide': {'status': tide_status}
-        }
-        
-        # Sanitize to remove NaN/Inf
-        return sanitize_prediction(result)
+        return [
+            _format_prediction(features, row)
+            for features, row in zip(features_list, rows)
+        ]
         
     except Exception as e:
         print(f"Error in ML prediction: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc(file=sys.stderr)
         # Return safe default values
-        return {
-            'waveHeight': 1.0,
-            'wavePeriod': 10.0,
-            'windSpeed': 15.0,
-            'windDirection': 0,
-            'tide': {'status': 'Mid'}
-        }
+        return [{**DEFAULT_PREDICTION, 'tide': dict(DEFAULT_PREDICTION['tide'])} for _ in features_list]
+
+
+def run_ml_prediction(features):
+    """
+    Run ML prediction with feature engineering.
+    
+    Args:
+        features: Dictionary with 10 base weather features
+    
+    Returns:
+        dict: Prediction with waveHeight, wavePeriod, windSpeed, windDirection, tide
+    """
+    return run_ml_predictions([features])[0]
+
+
+def _fetch_spot_features(spot):
+    """
+    Fetch the Random Forest input features for one spot (runs on a worker thread).
+    
+    Returns:
+        tuple: (features_dict, is_valid); ({}, False) if the fetch raised
+    """
+    try:
+        lng, lat = spot['coords']
+        return fetch_weather_data_with_rotation(
+            lat, lng,
+            hours_ahead=48,
+            feature_names=RANDOM_FOREST_BASE_FEATURES
+        )
+    except Exception as e:
+        print(f"Error fetching data for spot {spot.get('name', 'unknown')}: {e}", file=sys.stderr)
+        return {}, False
 
 
 def get_spots_with_predictions():
@@ -104,29 +159,31 @@ def get_spots_with_predictions():
     
     print(f"Processing {len(SURF_SPOTS)} surf spots...", file=sys.stderr)
     
-    for i, spot in enumerate(SURF_SPOTS, 1):
+    # Use mock data by default for performance (skip API calls).
+    # Otherwise the network-bound API fetches run concurrently; predictions stay on this thread.
+    if USE_MOCK_DATA:
+        fetched = [None] * len(SURF_SPOTS)
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, min(len(SURF_SPOTS), SPOT_FETCH_CONCURRENCY))) as pool:
+            fetched = list(pool.map(_fetch_spot_features, SURF_SPOTS))
+    
+    # One batched model call for every spot with valid API data
+    valid = [
+        i for i, spot_features in enumerate(fetched)
+        if SURF_PREDICTOR and spot_features is not None and spot_features[1] and spot_features[0]
+    ]
+    ml_forecasts = dict(zip(valid, run_ml_predictions([fetched[i][0] for i in valid])))
+    
+    for i, spot in enumerate(SURF_SPOTS):
         try:
-            # Use mock data by default for performance (skip API calls)
-            if USE_MOCK_DATA:
+            forecast = ml_forecasts.get(i)
+            if forecast is None:
                 forecast = generate_mock_spot_forecast(spot)
-            else:
-                # Fetch real API data
-                lng, lat = spot['coords']
-                features, is_valid = fetch_weather_data_with_rotation(
-                    lat, lng,
-                    hours_ahead=48,
-                    feature_names=RANDOM_FOREST_BASE_FEATURES
-                )
-                
-                if SURF_PREDICTOR and is_valid and features:
-                    forecast = run_ml_prediction(features)
-                else:
-                    forecast = generate_mock_spot_forecast(spot)
             
             all_spots_data.append({**spot, 'forecast': forecast})
             
-            if i % 10 == 0:
-                print(f"Processed {i}/{len(SURF_SPOTS)} spots", file=sys.stderr)
+            if (i + 1) % 10 == 0:
+                print(f"Processed {i + 1}/{len(SURF_SPOTS)} spots", file=sys.stderr)
                 
         except Exception as e:
             print(f"Error processing spot {spot.get('name', 'unknown')}: {e}", file=sys.stderr)
@@ -140,13 +197,43 @@ def get_spots_with_predictions():
     return all_spots_data
 
 
+def serve():
+    """
+    Long-lived mode: keep the model and spot list loaded and answer one request per stdin line.
+    
+    Each input line is a JSON request (currently just {}; its content is not
+    used). Each reply is one compact JSON line on stdout: {"spots": [...]}
+    as in CLI mode, or {"error": ...}. A {"ready": true} line is written
+    first, once the model is loaded.
+    """
+    warmup_random_forest_model()
+    print("✅ Spot recommendation service ready", file=sys.stderr)
+    # Handshake line: the backend starts request timeouts only after this
+    write_json({'ready': True})
+    
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        
+        try:
+            response = {'spots': get_spots_with_predictions()}
+        except Exception as e:
+            response = {'error': str(e)}
+        
+        write_json(response)
+
+
 def main():
     """CLI entry point - maintains backward compatibility"""
+    if len(sys.argv) >= 2 and sys.argv[1] == '--serve':
+        serve()
+        return
+    
     try:
         spots = get_spots_with_predictions()
         # Backend expects { spots: [...] } structure
         output = {'spots': spots}
-        print(json.dumps(output, indent=2))
+        write_json(output)
     except Exception as e:
         print(json.dumps({'error': str(e)}), file=sys.stderr)
         sys.exit(1)
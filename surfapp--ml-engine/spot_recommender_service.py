@@ -12,6 +12,7 @@ All business logic has been extracted to organized modules:
 
 Usage:
     python spot_recommender_service.py
+    python spot_recommender_service.py --serve   (one JSON request per stdin line)
     
 Output:
     JSON array of surf spots with forecast predictions
@@ -1,8 +1,32 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import time
+import random
+import os
+import glob
 import sys
+import argparse
+import threading
+import queue
+from collections import deque
+from itertools import chain
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson parses/serializes the large Stormglass payloads much faster than the stdlib decoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Make the ml-engine root importable so the shared config package can be used
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.api_keys import require_api_keys  # Shared key pool from STORMGLASS_KEY_* (e.g. 19 keys: 10 for Weligama, 9 for Arugam Bay).
+from config.features import RANDOM_FOREST_BASE_FEATURES, RANDOM_FOREST_TARGETS, LSTM_FEATURE_COLUMNS
 
 # =======================================================================
 # --- DAILY FRESH START CONFIGURATION ---
@@ -30,31 +54,13 @@ SPOT_CONFIGS = [
     {"name": "Arugam Bay", "lat": 6.843, "lng": 81.829},
 ]
 
-# List of your 19 unique API keys. Split: 10 for Weligama, 9 for Arugam Bay.
-API_KEYS = [
-    "2b9c359a-a5a8-11f0-8208-0242ac130006-2b9c3630-a5a8-11f0-8208-0242ac130006",
-    "af1036a4-a5be-11f0-8208-0242ac130006-af10371c-a5be-11f0-8208-0242ac130006",
-    "a3cc1756-a5c1-11f0-b808-0242ac130006-a3cc17ba-a5c1-11f0-b808-0242ac130006",
-    "2c822782-a5c4-11f0-9727-0242ac130006-2c8227e6-a5c4-11f0-9727-0242ac130006",
-    "68a5ab3a-a66e-11f0-a2a5-0242ac130006-68a5ac02-a66e-11f0-a2a5-0242ac130006",
-    "943fd418-a679-11f0-a2a5-0242ac130006-943fd490-a679-11f0-a2a5-0242ac130006",
-    "bb8f7ae8-c5cb-11f0-a8f4-0242ac130003-bb8f7b42-c5cb-11f0-a8f4-0242ac130003",
-    "204f4594-c5cc-11f0-b4de-0242ac130003-204f463e-c5cc-11f0-b4de-0242ac130003",
-    "3fd3b6ca-c5cc-11f0-b4de-0242ac130003-3fd3b72e-c5cc-11f0-b4de-0242ac130003",
-    "fe940b6e-c5cc-11f0-bd1c-0242ac130003-fe940bfa-c5cc-11f0-bd1c-0242ac130003",
-    # Keys 10 through 18 follow:
-    "24c61764-c5cd-11f0-a8f4-0242ac130003-24c617f0-c5cd-11f0-a8f4-0242ac130003",
-    "5c476b8e-c5cd-11f0-b5c3-0242ac130003-5c476c1a-c5cd-11f0-b5c3-0242ac130003",
-    "7d79cf90-c5cd-11f0-b5c3-0242ac130003-7d79d328-c5cd-11f0-b5c3-0242ac130003",
-    "9dc164de-c5cd-11f0-b5c3-0242ac130003-9dc16542-c5cd-11f0-b5c3-0242ac130003",
-    "ee8d38a2-c5cd-11f0-a0d3-0242ac130003-ee8d391a-c5cd-11f0-a0d3-0242ac130003",
-    "20a872ca-c5ce-11f0-a8f4-0242ac130003-20a87356-c5ce-11f0-a8f4-0242ac130003",
-    "57df12bc-c5ce-11f0-b4de-0242ac130003-57df1334-c5ce-11f0-b4de-0242ac130003",
-    "7b33f174-c5ce-11f0-a0d3-0242ac130003-7b33f200-c5ce-11f0-a0d3-0242ac130003",
-    "964936d6-c5ce-11f0-a148-0242ac130003-9649376c-c5ce-11f0-a148-0242ac130003"
-]
+# Resume overrides per spot: (start request number, resume end date). Other spots start fresh.
+SPOT_RESUME = {
+    "Weligama": (WELIGAMA_START_REQUEST, WELIGAMA_RESUME_DATE_END),
+}
 
 # FINAL DEFINITIVE PARAMETER LIST (Copied from the API's successful list)
+# Only requested with --all-params, for occasional full research dumps.
 ALL_PARAMETERS = [
     # Core Atmospheric/Temperature
     "airTemperature", "cloudCover", "dewPointTemperature", "humidity", 
@@ -88,25 +94,206 @@ ALL_PARAMETERS = [
     "snowAlbedo", "snowDepth", "iceCover", "seaIceThickness"
 ]
 
+# Parameters the ML pipeline actually consumes (Random Forest features/targets + LSTM series).
+# Requesting only these keeps each response ~5x smaller than the full list.
+NEEDED_PARAMETERS = sorted({
+    *RANDOM_FOREST_BASE_FEATURES,
+    *RANDOM_FOREST_TARGETS,
+    *LSTM_FEATURE_COLUMNS,
+    'waveHeight', 'wavePeriod', 'swellHeight', 'swellPeriod'
+})
 
-# --- Helper Function to Fetch Data for a Single Spot ---
+# Joined once here instead of on every request
+ALL_PARAMETERS_CSV = ",".join(ALL_PARAMETERS)
+NEEDED_PARAMETERS_CSV = ",".join(NEEDED_PARAMETERS)
+
+# Sources requested for every parameter
+SOURCES = ['noaa', 'sg', 'ecmwf']
+
+# Weather sources Stormglass accepts; a typo in SOURCES fails at import instead of as a 422 mid-run
+KNOWN_SOURCES = {'sg', 'noaa', 'ecmwf', 'icon', 'dwd', 'meteo', 'meto', 'fcoo', 'fmi', 'yr', 'smhi'}
+_unknown_sources = set(SOURCES) - KNOWN_SOURCES
+if _unknown_sources:
+    raise ValueError(f"Unknown Stormglass source(s) in SOURCES: {sorted(_unknown_sources)}")
+
+SOURCES_CSV = ",".join(SOURCES)
+
+
+# Sort key for hour records; itemgetter runs in C instead of a Python lambda frame per comparison
+BY_TIME = itemgetter('time')
+
+
+def split_api_keys(api_keys, spot_count):
+    """Splits the key pool into contiguous blocks, one per spot; earlier spots get any remainder."""
+    base, extra = divmod(len(api_keys), spot_count)
+    blocks = []
+    start = 0
+    for spot_index in range(spot_count):
+        end = start + base + (1 if spot_index < extra else 0)
+        blocks.append(api_keys[start:end])
+        start = end
+    return blocks
+
+
+# --- Thread-safe Logging ---
+
+# Both spots are collected concurrently, so progress lines go through a lock to stay readable.
+_print_lock = threading.Lock()
+
+def log(message):
+    """Prints a progress line without interleaving output from the other collection thread."""
+    with _print_lock:
+        print(message, flush=True)
+
+
+# --- HTTP Session (keep-alive) ---
+
+def create_session():
+    """Creates a requests.Session that reuses the TLS connection to Stormglass across requests."""
+    session = requests.Session()
+    # Retries are handled by our own backoff loop, so the adapter itself never retries.
+    # pool_maxsize covers one connection per concurrently running key worker (up to 10 keys per spot).
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=Retry(total=0))
+    session.mount('https://', adapter)
+    # The JSON payloads compress ~8-10x; requests decompresses transparently
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    return session
+
+
+# --- Helper Functions to Fetch Data for a Single Spot ---
+
+BASE_URL = 'https://api.stormglass.io/v2/weather/point'
+REQUESTS_PER_KEY = 10   # Free-tier daily quota per key
+DAYS_PER_REQUEST = 10   # Stormglass historical window per request
+SECONDS_PER_WINDOW = DAYS_PER_REQUEST * 86400
+# A window that keeps failing is handed back to the queue this many times in total
+MAX_WINDOW_ATTEMPTS = 3
+
+# Server-side/transient failures worth retrying; other 4xx client errors will not succeed on retry
+RETRIABLE_STATUS_CODES = (408, 425, 429, 500, 502, 503, 504)
+
+# The key itself is invalid or revoked, so no window will ever succeed with it
+KEY_REJECTED_STATUS_CODES = (401, 403)
+
+# The key is out of requests for now: 402 = daily quota used up, 429 = rate limit.
+# The window itself is fine, so it goes back to the queue for another key.
+QUOTA_EXHAUSTED_STATUS_CODES = (402, 429)
+
+
+def _is_retriable(status):
+    """True if a request that failed with this HTTP status may succeed when retried."""
+    return status in RETRIABLE_STATUS_CODES
+
+
+def _backoff_sleep(attempt, base=1.0, cap=30.0):
+    """
+    Sleeps for an exponentially growing delay with uniform jitter, capped at `cap` seconds.
+    Jitter keeps concurrent key chains from retrying in lock-step after a shared failure.
+    """
+    delay = min(cap, base * (2 ** attempt) * (1 + random.random() * 0.5))
+    time.sleep(delay)
+    return delay
+
+
+def _utc_date(timestamp):
+    """Formats a UNIX timestamp as a UTC date, for log lines only."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).date()
+
+
+def _intern_hours(hours):
+    """
+    Interns the repeated parameter/source keys of one response in place.
+    The JSON decoder only shares key strings within a single document, so without this
+    every 10-day window would keep its own copies of the ~55 parameter and source names.
+    """
+    for i, hour in enumerate(hours):
+        interned_hour = {}
+        for key, value in hour.items():
+            if isinstance(value, dict):
+                value = {sys.intern(source): source_value for source, source_value in value.items()}
+            interned_hour[sys.intern(key)] = value
+        hours[i] = interned_hour
+    return hours
+
+
+def _request_with_backoff(session, spot_name, key_number, params, headers):
+    """
+    Issues a single Stormglass request with exponential backoff on transient errors.
+
+    Returns:
+        tuple: (status, hours) where status is 'ok', 'empty', 'rate_limited', 'key_rejected', 'failed'
+               or 'fatal' (the request itself is invalid, so the whole run must stop)
+    """
+    retries = 0
+    max_retries = 3
+
+    while retries < max_retries:
+        response = None
+        try:
+            # Reuse the pooled keep-alive connection instead of a fresh TLS handshake per request
+            response = session.get(BASE_URL, params=params, headers=headers, timeout=10)
+
+            if response.status_code in QUOTA_EXHAUSTED_STATUS_CODES: # Rate limit or daily quota hit
+                log(f"  {spot_name}: Quota/rate limit hit for Key #{key_number} (HTTP {response.status_code}). Stopping this key's chain.")
+                return 'rate_limited', None
+
+            if response.status_code == 422:
+                error_details = response.json().get('errors', 'No details provided.')
+                log(f"  {spot_name} CRITICAL ERROR (422 Unprocessable Entity): Parameters rejected by API. Details: {error_details}. Stopping.")
+                # Fatal error, stop entirely. This runs on a worker thread, so the caller
+                # stops the other workers and the main thread exits once they have joined.
+                return 'fatal', None
+
+            response.raise_for_status()
+
+            # Successful response
+            data = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
+            if 'hours' in data and data['hours']:
+                return 'ok', _intern_hours(data['hours'])
+            return 'empty', None
+
+        except requests.exceptions.HTTPError as e:
+            if response is not None and response.status_code in KEY_REJECTED_STATUS_CODES:
+                log(f"  {spot_name} FATAL CLIENT ERROR: {e}. Key #{key_number} rejected, skipping key.")
+                return 'key_rejected', None
+            if response is not None and not _is_retriable(response.status_code):
+                log(f"  {spot_name} FATAL CLIENT ERROR: {e}. Not retriable, giving up on this window.")
+                return 'failed', None
+            retries += 1
+            log(f"  {spot_name} ERROR: {e}. Retrying (attempt {retries}/{max_retries})...")
+            _backoff_sleep(retries)
+
+        except requests.exceptions.RequestException as e:
+            # This catches the ConnectTimeoutError and other connection issues
+            retries += 1
+            log(f"  {spot_name} CRITICAL CONNECTION ERROR: {e}. Retrying (attempt {retries}/{max_retries})...")
+            _backoff_sleep(retries)
+
+    return 'failed', None
+
+
+def fetch_data_for_spot(session, spot_name, lat, lng, api_keys_subset, start_request_num=1, resume_end_date_str=None, collected_until=None, parameters_csv=NEEDED_PARAMETERS_CSV, stop_event=None):
+    """
+    Fetches historical data for a single spot using a subset of API keys.
+    All 10-day windows go into a shared queue drained by one worker per API key,
+    so a slow or rate-limited key never stalls the windows other keys could be fetching.
+    If collected_until (datetime of the newest saved hour) is given, windows it already covers are not requested.
+    stop_event is set on a fatal API error; every worker (of any spot sharing it) then stops
+    taking windows, and the caller is expected to exit once this returns.
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
 
-def fetch_data_for_spot(spot_name, lat, lng, api_keys_subset, start_request_num=1, resume_end_date_str=None):
-    """Fetches historical data for a single spot using a subset of API keys."""
-    base_url = 'https://api.stormglass.io/v2/weather/point'
-    
     # Determine the starting date. If resuming, use the provided end date.
     if resume_end_date_str:
         # Convert the resumption date (which was the end of the last successful block)
         end_date = datetime.strptime(resume_end_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-        print(f"  Resuming collection. Starting date calculation from: {end_date.date()}")
+        log(f"  {spot_name}: Resuming collection. Starting date calculation from: {end_date.date()}")
     else:
         # Start fresh from today (This is the default for a "fresh" run)
         end_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
     
-    spot_hours_data = []
-    spot_requests_made = 0
-    max_requests_for_spot = len(api_keys_subset) * 10
+    max_requests_for_spot = len(api_keys_subset) * REQUESTS_PER_KEY
     
     # --- Check for Skip Mode ---
     if not COLLECT_WELIGAMA and spot_name == "Weligama":
@@ -115,101 +302,146 @@ def fetch_data_for_spot(spot_name, lat, lng, api_keys_subset, start_request_num=
          return { "spot_name": spot_name, "hours": [], "requests_used": 0, "total_hours": 0, "lat": lat, "lng": lng }
     # --- End Skip Mode Check ---
 
-    print(f"\n--- Starting Collection for {spot_name} ---")
-    print(f"  Allocated Keys: {len(api_keys_subset)} | Max Requests: {max_requests_for_spot}")
-    
-    # Adjust loop range to resume from the specified request number (start_request_num is 1-indexed)
-    for request_index in range(start_request_num - 1, max_requests_for_spot):
-        
-        key_index_in_subset = request_index // 10
-        
-        if key_index_in_subset >= len(api_keys_subset):
-             print(f"  STOPPED: Exhausted allocated API keys for {spot_name}.")
-             break
+    log(f"\n--- Starting Collection for {spot_name} ---")
+    log(f"  {spot_name} Allocated Keys: {len(api_keys_subset)} | Max Requests: {max_requests_for_spot}")
 
-        current_key = api_keys_subset[key_index_in_subset]
-        
-        # Calculate 10-day window backwards
-        start_date = end_date - timedelta(days=10)
-        start_ts = int(start_date.timestamp())
-        end_ts = int(end_date.timestamp())
-
-        params = {
-            'lat': lat,
-            'lng': lng,
-            'params': ",".join(ALL_PARAMETERS),
-            'start': start_ts,
-            'end': end_ts,
-            'source': 'noaa,sg,ecmwf'
-        }
-        
-        headers = {'Authorization': current_key}
-        
-        print(f"  {spot_name} Request {request_index + 1}/{max_requests_for_spot} | Key Index: {key_index_in_subset + 1} | Dates: {start_date.date()} to {end_date.date()}")
-        
-        # --- API Request with Exponential Backoff for Robustness ---
-        retries = 0
-        max_retries = 3
-        
-        success = False
-        response = None
-        while retries < max_retries:
+    window_queue = queue.Queue()
+
+    # Windows a previous run failed to fetch go first: the incremental resume below only
+    # requests hours newer than the saved data, so nothing else would fill these holes
+    pending_windows = load_pending_windows(spot_name)
+    if pending_windows:
+        log(f"  {spot_name}: Retrying {len(pending_windows)} window(s) skipped by a previous run.")
+    for start_ts, end_ts in pending_windows:
+        window_queue.put((None, start_ts, end_ts))
+
+    # Resume from the specified request number (start_request_num is 1-indexed).
+    # Precompute every remaining 10-day window, newest first.
+    # Windows are plain UNIX-second pairs computed from one epoch, so the hot path never touches datetime.
+    first_request_index = start_request_num - 1
+    end_epoch = int(end_date.timestamp())
+    saved_until_epoch = int(collected_until.timestamp()) if collected_until is not None else None
+    for request_index in range(first_request_index, max_requests_for_spot):
+        end_ts = end_epoch - (request_index - first_request_index) * SECONDS_PER_WINDOW
+        start_ts = end_ts - SECONDS_PER_WINDOW
+        if saved_until_epoch is not None and end_ts <= saved_until_epoch:
+            break # Everything from here back is already saved
+        window_queue.put((request_index, start_ts, end_ts))
+        if saved_until_epoch is not None and start_ts <= saved_until_epoch:
+            break # This window bridges the gap to the saved data
+
+    if collected_until is not None:
+        log(f"  {spot_name}: Saved data runs until {collected_until.isoformat()}. Requesting {window_queue.qsize() - len(pending_windows)} newer window(s).")
+
+    hour_batches = deque()
+    state_lock = threading.Lock()
+    # End timestamp of the newest window that came back empty; anything at or before it has no data either
+    no_data_before = [None]
+    # Failed attempts per window, and windows given up on after MAX_WINDOW_ATTEMPTS
+    window_attempts = {}
+    failed_windows = []
+
+    def key_worker(api_key, key_number, request_budget):
+        """Drains windows with one API key until the queue is empty, its budget is spent, or it is rate limited."""
+        headers = {'Authorization': api_key}
+        requests_sent = 0
+        successful_requests = 0
+
+        while requests_sent < request_budget and not stop_event.is_set():
             try:
-                # Use requests.Session or increase the connection pool size for many requests, 
-                # but for simplicity, we rely on the retries here.
-                response = requests.get(base_url, params=params, headers=headers, timeout=10) 
-                
-                if response.status_code == 429: # Rate Limit Hit
-                    print(f"  Rate Limit hit for Key #{key_index_in_subset + 1}. Moving to the next key block.")
-                    raise requests.exceptions.HTTPError(response=response)
-
-                response.raise_for_status() 
-                
-                # Successful response
-                data = response.json()
-                
-                if 'hours' in data and data['hours']:
-                    # Update data and counters outside the retry loop structure
-                    spot_hours_data = data['hours'] + spot_hours_data
-                    spot_requests_made += 1
-                    end_date = start_date # Move the end_date back 10 days
-                    
-                    print(f"  SUCCESS. Collected {len(data['hours'])} hourly entries. Total: {len(spot_hours_data)} hours.")
-                    success = True
-                    break # Exit retry loop
-                else:
-                    print(f"  WARNING: API returned success but no 'hours' data for this period. Stopping collection for {spot_name}.")
-                    break 
-
-            except requests.exceptions.HTTPError as e:
-                if response and response.status_code == 422:
-                    error_details = response.json().get('errors', 'No details provided.')
-                    print(f"  CRITICAL ERROR (422 Unprocessable Entity): Parameters rejected by API. Details: {error_details}. Stopping.")
-                    # Fatal error, stop entirely.
-                    sys.exit(1)
-                
-                elif response and response.status_code == 429:
-                    break # Break out of the while loop to allow the main loop to switch keys.
-                    
-                else:
-                    retries += 1
-                    wait_time = 2 ** retries
-                    print(f"  ERROR: {e}. Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-            
-            except requests.exceptions.RequestException as e:
-                # This catches the ConnectTimeoutError and other connection issues
-                retries += 1
-                wait_time = 2 ** retries
-                print(f"  CRITICAL CONNECTION ERROR: {e}. Retrying in {wait_time}s...")
-                time.sleep(wait_time)
-        
-        if not success:
-            # If the while loop finishes without success, break the main for loop.
-            if response is None or response.status_code != 429: 
+                request_index, start_ts, end_ts = window_queue.get_nowait()
+            except queue.Empty:
                 break
-        
-        # If 429 was hit, the main for loop continues to the next request which uses the next key.
+
+            with state_lock:
+                cutoff = no_data_before[0]
+            if cutoff is not None and end_ts <= cutoff:
+                continue # Skip without spending a request
+
+            params = {
+                'lat': lat,
+                'lng': lng,
+                'params': parameters_csv,
+                'start': start_ts,
+                'end': end_ts,
+                'source': SOURCES_CSV
+            }
+
+            request_label = f"Request {request_index + 1}/{max_requests_for_spot}" if request_index is not None else "Skipped-window retry"
+            log(f"  {spot_name} {request_label} | Key Index: {key_number} | Dates: {_utc_date(start_ts)} to {_utc_date(end_ts)}")
+
+            status, hours = _request_with_backoff(session, spot_name, key_number, params, headers)
+            requests_sent += 1
+
+            if status == 'fatal':
+                # Keep the window for the next run and stop every worker
+                window_queue.put((request_index, start_ts, end_ts))
+                stop_event.set()
+                break
+
+            if status in ('rate_limited', 'key_rejected'):
+                # Hand the window to another key and retire this one
+                window_queue.put((request_index, start_ts, end_ts))
+                break
+
+            if status == 'failed':
+                with state_lock:
+                    attempts = window_attempts.get(start_ts, 0) + 1
+                    window_attempts[start_ts] = attempts
+                if attempts < MAX_WINDOW_ATTEMPTS:
+                    log(f"  {spot_name}: Requeueing {_utc_date(start_ts)} to {_utc_date(end_ts)} (attempt {attempts}/{MAX_WINDOW_ATTEMPTS} failed).")
+                    window_queue.put((request_index, start_ts, end_ts))
+                else:
+                    log(f"  {spot_name}: Giving up on {_utc_date(start_ts)} to {_utc_date(end_ts)} for this run after {attempts} attempts.")
+                    with state_lock:
+                        failed_windows.append((start_ts, end_ts))
+                continue
+
+            if status == 'empty':
+                log(f"  WARNING: API returned success but no 'hours' data for {_utc_date(start_ts)} to {_utc_date(end_ts)}. Skipping older windows for {spot_name}.")
+                with state_lock:
+                    if no_data_before[0] is None or end_ts > no_data_before[0]:
+                        no_data_before[0] = end_ts
+                continue
+
+            if status == 'ok':
+                write_window_checkpoint(spot_name, start_ts, hours)
+                hour_batches.append(hours)
+                successful_requests += 1
+                log(f"  {spot_name} SUCCESS (Key #{key_number}). Collected {len(hours)} hourly entries.")
+
+        return successful_requests
+
+    # Each key keeps its daily quota: keys whose block was already used before the resume point get fewer requests.
+    workers = []
+    for key_index, api_key in enumerate(api_keys_subset):
+        request_budget = len(range(max(first_request_index, key_index * REQUESTS_PER_KEY), (key_index + 1) * REQUESTS_PER_KEY))
+        if request_budget > 0:
+            workers.append((api_key, key_index + 1, request_budget))
+
+    spot_requests_made = 0
+    if workers:
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            futures = [executor.submit(key_worker, *worker) for worker in workers]
+            spot_requests_made = sum(future.result() for future in futures)
+
+    # Windows still queued were never fetched: requeued after every other worker had
+    # already left, or out of request budget. Keep them, with the failed ones, for the next run.
+    skipped_windows = failed_windows
+    while True:
+        try:
+            _, start_ts, end_ts = window_queue.get_nowait()
+        except queue.Empty:
+            break
+        if no_data_before[0] is None or end_ts > no_data_before[0]:
+            skipped_windows.append((start_ts, end_ts))
+    write_pending_windows(spot_name, skipped_windows)
+    if skipped_windows:
+        log(f"  {spot_name}: {len(skipped_windows)} window(s) not fetched this run. Saved to {pending_windows_filename(spot_name)} for the next run.")
+
+    # Windows complete in any order, so merge everything back into chronological order once
+    spot_hours_data = sorted(chain.from_iterable(hour_batches), key=BY_TIME)
+    log(f"  {spot_name}: Collected {len(spot_hours_data)} hours from {spot_requests_made} requests.")
 
     # Return the collected data up to the point of failure
     return {
@@ -222,63 +454,211 @@ def fetch_data_for_spot(spot_name, lat, lng, api_keys_subset, start_request_num=
     }
 
 
+# --- Columnar Export ---
+
+def hours_to_frame(hours, parameters=NEEDED_PARAMETERS):
+    """
+    Converts the list-of-dicts `hours` payload into a columnar DataFrame:
+    one float64 column per (parameter, source) pair, indexed by UTC time.
+    """
+    import pandas as pd
+
+    columns = {
+        f"{param}_{source}": [hour.get(param, {}).get(source) for hour in hours]
+        for param in parameters
+        for source in SOURCES
+    }
+    index = pd.DatetimeIndex(pd.to_datetime([hour['time'] for hour in hours], utc=True), name='time')
+    return pd.DataFrame(columns, index=index, dtype='float64').sort_index()
+
+
+# --- Saved Data (incremental runs) ---
+
+def output_filename_for(spot_name):
+    """Returns the JSON file a spot's collected data is saved to."""
+    return f"{spot_name.lower().replace(' ', '_')}_historical_data_fixed.json"
+
+
+def _write_atomic(filename, blob):
+    """Writes bytes to a temp file and swaps it in, so a crash mid-write never leaves a truncated file."""
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'wb') as f:
+        f.write(blob)
+    os.replace(tmp_filename, filename)
+
+
+def _checkpoint_prefix(spot_name):
+    return f"{spot_name.lower().replace(' ', '_')}_w"
+
+
+def write_window_checkpoint(spot_name, start_ts, hours):
+    """
+    Saves one fetched window to its own file as soon as it arrives.
+    If the run is killed before the final save, the next run picks these up instead of re-fetching them.
+    """
+    blob = orjson.dumps(hours) if ORJSON_AVAILABLE else json.dumps(hours).encode('utf-8')
+    _write_atomic(f"{_checkpoint_prefix(spot_name)}{start_ts}.json", blob)
+
+
+def window_checkpoint_files(spot_name):
+    """Lists the per-window checkpoint files left for a spot."""
+    return sorted(glob.glob(f"{_checkpoint_prefix(spot_name)}[0-9]*.json"))
+
+
+def load_window_checkpoints(spot_name):
+    """Loads the hours from every per-window checkpoint of a spot."""
+    hours = []
+    for checkpoint_file in window_checkpoint_files(spot_name):
+        try:
+            with open(checkpoint_file, 'rb') as f:
+                content = f.read()
+            hours.extend(orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content))
+        except ValueError:
+            print(f"WARNING: Could not decode checkpoint {checkpoint_file}. Skipping it.")
+    if hours:
+        print(f"Recovered {len(hours)} hours for {spot_name} from unmerged window checkpoints.")
+    return hours
+
+
+def pending_windows_filename(spot_name):
+    """Returns the file listing a spot's windows that still have to be fetched."""
+    return f"{_checkpoint_prefix(spot_name)}pending.json"
+
+
+def write_pending_windows(spot_name, windows):
+    """Saves the (start, end) windows a run could not fetch, or removes the file if there are none."""
+    filename = pending_windows_filename(spot_name)
+    if windows:
+        _write_atomic(filename, json.dumps(sorted(windows, reverse=True)).encode('utf-8'))
+    elif os.path.exists(filename):
+        os.remove(filename)
+
+
+def load_pending_windows(spot_name):
+    """Loads the (start, end) windows a previous run could not fetch, newest first."""
+    try:
+        with open(pending_windows_filename(spot_name), 'rb') as f:
+            return [tuple(window) for window in json.loads(f.read())]
+    except FileNotFoundError:
+        return []
+    except ValueError:
+        print(f"WARNING: Could not decode {pending_windows_filename(spot_name)}. Ignoring it.")
+        return []
+
+
+def load_saved_hours(output_filename):
+    """Loads the hours saved by a previous run, or an empty list if there is no usable file."""
+    try:
+        with open(output_filename, 'rb') as f:
+            content = f.read()
+        data = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+        return data.get('hours', [])
+    except FileNotFoundError:
+        print(f"No previous data file {output_filename}. Starting a fresh collection.")
+    except ValueError: # json.JSONDecodeError and orjson.JSONDecodeError are both ValueErrors
+        print(f"WARNING: Could not decode JSON from {output_filename}.")
+    return []
+
+
+def merge_hours(saved_hours, new_hours):
+    """Merges newly collected hours into the saved ones (new data wins on overlap), sorted by time."""
+    merged = {hour['time']: hour for hour in saved_hours}
+    merged.update((hour['time'], hour) for hour in new_hours)
+    return [merged[time_key] for time_key in sorted(merged)]
+
+
 # --- Main Execution Logic ---
 
-def collect_historical_data():
-    
-    # Split the 19 API keys: 10 for spot 1, 9 for spot 2
-    split_point = 10
-    weligama_keys = API_KEYS[:split_point]
-    arugambay_keys = API_KEYS[split_point:]
-
-    print(f"Total API keys available: {len(API_KEYS)}")
-    print(f"Weligama key budget: {len(weligama_keys)} keys (Max 100 requests)")
-    print(f"Arugam Bay key budget: {len(arugambay_keys)} keys (Max 90 requests)")
-
-    # 1. Collect data for Weligama 
-    weligama_result = fetch_data_for_spot(
-        spot_name=SPOT_CONFIGS[0]['name'],
-        lat=SPOT_CONFIGS[0]['lat'],
-        lng=SPOT_CONFIGS[0]['lng'],
-        api_keys_subset=weligama_keys,
-        start_request_num=WELIGAMA_START_REQUEST,
-        resume_end_date_str=WELIGAMA_RESUME_DATE_END
-    )
-
-    # 2. Collect data for Arugam Bay 
-    arugambay_result = fetch_data_for_spot(
-        spot_name=SPOT_CONFIGS[1]['name'],
-        lat=SPOT_CONFIGS[1]['lat'],
-        lng=SPOT_CONFIGS[1]['lng'],
-        api_keys_subset=arugambay_keys
-    )
+def collect_historical_data(write_parquet=False, full_refresh=False, all_params=False):
+    """
+    Collects historical data for both spots and saves one JSON file per spot.
+    New hours are merged into each spot's existing file; fresh runs only request windows newer than it
+    unless full_refresh=True.
+    Only NEEDED_PARAMETERS are requested unless all_params=True.
+    With write_parquet=True a columnar .parquet copy (requires pyarrow) is written alongside each JSON file.
+    """
+    parameters = ALL_PARAMETERS if all_params else NEEDED_PARAMETERS
+    parameters_csv = ALL_PARAMETERS_CSV if all_params else NEEDED_PARAMETERS_CSV
+    print(f"Requesting {len(parameters)} parameters per window")
+
+    try:
+        api_keys = require_api_keys()
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    # Split the API keys into contiguous per-spot blocks (19 keys: 10 for spot 1, 9 for spot 2)
+    keys_per_spot = split_api_keys(api_keys, len(SPOT_CONFIGS))
+
+    print(f"Total API keys available: {len(api_keys)}")
+    for spot, spot_keys in zip(SPOT_CONFIGS, keys_per_spot):
+        print(f"{spot['name']} key budget: {len(spot_keys)} keys (Max {len(spot_keys) * REQUESTS_PER_KEY} requests)")
+
+    # Load what previous runs already saved (including windows a crashed run checkpointed)
+    # so only newer windows are requested
+    saved_hours = {
+        spot['name']: merge_hours(load_saved_hours(output_filename_for(spot['name'])), load_window_checkpoints(spot['name']))
+        for spot in SPOT_CONFIGS
+    }
+
+    def collected_until(spot_name, resume_end_date_str=None):
+        # Resumed runs walk further back in time, so they must not stop at the saved data
+        if full_refresh or resume_end_date_str or not saved_hours[spot_name]:
+            return None
+        return datetime.fromisoformat(max(hour['time'] for hour in saved_hours[spot_name]))
+
+    # Each spot uses a disjoint key subset, so all spot collections run concurrently.
+    # Every thread gets its own Session to avoid contending on a shared connection pool.
+    sessions = [create_session() for _ in SPOT_CONFIGS]
+    # Set by any worker on a fatal API error (422); shared so both spots stop early
+    stop_event = threading.Event()
+    try:
+        with ThreadPoolExecutor(max_workers=len(SPOT_CONFIGS)) as executor:
+            futures = []
+            for spot, spot_keys, session in zip(SPOT_CONFIGS, keys_per_spot, sessions):
+                start_request_num, resume_end_date_str = SPOT_RESUME.get(spot['name'], (1, None))
+                futures.append(executor.submit(
+                    fetch_data_for_spot,
+                    session,
+                    spot_name=spot['name'],
+                    lat=spot['lat'],
+                    lng=spot['lng'],
+                    api_keys_subset=spot_keys,
+                    start_request_num=start_request_num,
+                    resume_end_date_str=resume_end_date_str,
+                    collected_until=collected_until(spot['name'], resume_end_date_str),
+                    parameters_csv=parameters_csv,
+                    stop_event=stop_event
+                ))
+
+            final_results = [future.result() for future in futures]
+    finally:
+        for session in sessions:
+            session.close()
+
+    if stop_event.is_set():
+        # Fetched windows are checkpointed and unfetched ones saved as pending,
+        # so the next run (with fixed parameters) picks up from here
+        print("Stopping after a fatal API error. Fix the request parameters and run again.")
+        sys.exit(1)
 
     # --- Final Processing and Saving ---
     
-    final_results = [weligama_result, arugambay_result]
+    date_collected = datetime.now(timezone.utc).isoformat()
     
     for result in final_results:
-        output_filename = f"{result['spot_name'].lower().replace(' ', '_')}_historical_data_fixed.json"
+        output_filename = output_filename_for(result['spot_name'])
         
-        # --- Load Logic: Check if we successfully collected data in this run ---
-        if not result['hours']:
-            # If the current run collected no data (e.g., due to a skip or early failure),
-            # attempt to load the previously saved large file to ensure it's preserved.
-            try:
-                with open(output_filename, 'r') as f:
-                    data = json.load(f)
-                    result['hours'] = data['hours']
-                    result['total_hours'] = len(result['hours'])
-                    # Estimate requests used from the loaded file for accurate final metadata
-                    result['requests_used'] = result['total_hours'] // 24 
-            except FileNotFoundError:
-                print(f"WARNING: Previous data file {output_filename} not found. Saving metadata only.")
-            except json.JSONDecodeError:
-                 print(f"WARNING: Could not decode JSON from {output_filename}. Saving metadata only.")
+        # --- Merge Logic: keep everything previous runs saved ---
+        if saved_hours[result['spot_name']]:
+            result['hours'] = merge_hours(saved_hours[result['spot_name']], result['hours'])
+            result['total_hours'] = len(result['hours'])
+        elif not result['hours']:
+            print(f"WARNING: No data collected for {result['spot_name']}. Saving metadata only.")
 
         # --- Final Metadata Calculation ---
         if result['hours']:
-            result['hours'].sort(key=lambda x: x['time'])
+            result['hours'].sort(key=BY_TIME)
             earliest_data_point = result['hours'][0]['time']
         else:
             earliest_data_point = None
@@ -294,21 +674,46 @@ def collect_historical_data():
                 "requests_used": total_days_collected // 10, # 1 request per 10 days
                 "total_hours": result['total_hours'],
                 "total_days_collected": total_days_collected,
-                "date_collected": datetime.now(timezone.utc).isoformat(),
+                "date_collected": date_collected,
                 "earliest_data_point": earliest_data_point
             },
             "hours": result['hours']
         }
         
         # --- Save ---
-        with open(output_filename, 'w') as f:
-            json.dump(output_json, f, indent=4)
+        # The whole document is serialized in memory first and written with a single call.
+        if ORJSON_AVAILABLE:
+            blob = orjson.dumps(output_json, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            blob = json.dumps(output_json, indent=2).encode('utf-8')
+        _write_atomic(output_filename, blob)
+
+        # Every checkpointed window is now part of the consolidated file
+        for checkpoint_file in window_checkpoint_files(result['spot_name']):
+            os.remove(checkpoint_file)
         
         print(f"\n--- Saved {result['spot_name']} Data ---")
         print(f"  Requests Used (Estimated): {output_json['metadata']['requests_used']}")
         print(f"  Total Days Collected: {total_days_collected}")
         print(f"  File: {output_filename}")
 
+        if write_parquet and result['hours']:
+            parquet_filename = output_filename.replace('.json', '.parquet')
+            try:
+                hours_to_frame(result['hours'], parameters).to_parquet(parquet_filename, compression='zstd')
+                print(f"  Columnar copy: {parquet_filename}")
+            except ImportError as e:
+                print(f"  WARNING: Could not write {parquet_filename} ({e}). Install pandas and pyarrow.")
+
 
 if __name__ == "__main__":
-    collect_historical_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Collect historical Stormglass data for Weligama and Arugam Bay.")
+    parser.add_argument('--parquet', action='store_true',
+                        help="Also write a columnar .parquet copy of each spot's data (requires pyarrow)")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Ignore previously saved data and request every window again")
+    parser.add_argument('--all-params', action='store_true',
+                        help="Request every Stormglass parameter instead of only those the ML models use")
+    args = parser.parse_args()
+
+    collect_historical_data(write_parquet=args.parquet, full_refresh=args.full_refresh, all_params=args.all_params)
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Export the trained multi-output LSTM to ONNX for faster inference.
+
+models/lstm.py picks up the exported file automatically when onnxruntime is
+installed (TensorRT/CUDA execution providers are used if the build has them,
+otherwise the CPU provider). The Keras model remains the fallback.
+
+Requires: pip install tf2onnx onnxruntime
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import LSTM_MODEL, LSTM_ONNX_MODEL
+
+try:
+    import tensorflow as tf
+    import tf2onnx
+except ImportError:
+    print("❌ TensorFlow and tf2onnx are required!")
+    print("   Install with: pip install tensorflow tf2onnx onnxruntime")
+    sys.exit(1)
+
+
+def export_to_onnx():
+    """Convert the Keras LSTM to ONNX and check it matches the Keras output"""
+    if not os.path.exists(LSTM_MODEL):
+        print(f"❌ Model not found: {LSTM_MODEL}")
+        print("   Run train_wave_forecast_lstm.py first!")
+        return False
+
+    print(f"Loading {LSTM_MODEL}...")
+    model = tf.keras.models.load_model(LSTM_MODEL)
+
+    # Dynamic batch dimension, fixed 168-hour window of 6 features
+    spec = (tf.TensorSpec((None, 168, 6), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=LSTM_ONNX_MODEL)
+    print(f"✅ Saved: {LSTM_ONNX_MODEL}")
+
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        print("⚠️  onnxruntime not installed, skipping verification")
+        return True
+
+    sample = np.random.default_rng(42).standard_normal((1, 168, 6)).astype(np.float32)
+    session = ort.InferenceSession(LSTM_ONNX_MODEL, providers=['CPUExecutionProvider'])
+    onnx_out = session.run(None, {session.get_inputs()[0].name: sample})[0]
+    keras_out = model.predict(sample, verbose=0)
+    max_diff = float(np.max(np.abs(onnx_out - keras_out)))
+    print(f"✅ Max abs difference vs Keras: {max_diff:.2e}")
+    return True
+
+
+if __name__ == '__main__':
+    export_to_onnx()
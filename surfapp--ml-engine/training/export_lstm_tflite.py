@@ -0,0 +1,122 @@
+"""
+Export the trained multi-output LSTM to a quantized TFLite model.
+
+Default is full int8 quantization, calibrated on a sample of the (scaled)
+training windows from prepare_timeseries_data.py. --dynamic-range skips
+calibration (int8 weights, float activations) and needs only the .keras
+file. Either way the input is pinned to (1, 168, 6) and inputs/outputs
+stay float32, so
+models/lstm.py can feed the interpreter the same scaled arrays it feeds
+Keras; it picks the file up automatically when present.
+
+For edge/mobile deployment only the .tflite file and the two scalers are
+needed (tflite_runtime is enough to run it).
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import LSTM_MODEL, LSTM_SCALER_X, LSTM_TFLITE_MODEL
+
+try:
+    import tensorflow as tf
+except ImportError:
+    print("❌ TensorFlow not installed!")
+    print("   Install with: pip install tensorflow")
+    sys.exit(1)
+
+import joblib
+
+DATA_X_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'artifacts', 'timeseries_X_multioutput.npy')
+CALIBRATION_SAMPLES = 200
+
+
+def load_calibration_windows():
+    """Scaled (1, 168, 6) windows for int8 range calibration"""
+    X = np.load(DATA_X_FILE, mmap_mode='r')
+    X = X[~np.isnan(X).any(axis=(1, 2))]
+    
+    rng = np.random.default_rng(42)
+    idx = rng.choice(len(X), size=min(CALIBRATION_SAMPLES, len(X)), replace=False)
+    
+    scaler_X = joblib.load(LSTM_SCALER_X)
+    sample = X[idx]
+    scaled = scaler_X.transform(sample.reshape(-1, sample.shape[-1])).reshape(sample.shape)
+    return scaled.astype(np.float32)
+
+
+def _fixed_shape_converter(model):
+    """Converter for a concrete function with the input pinned to (1, 168, 6)"""
+    @tf.function(input_signature=[tf.TensorSpec((1, 168, 6), tf.float32)])
+    def serve(x):
+        return model(x, training=False)
+    
+    return tf.lite.TFLiteConverter.from_concrete_functions([serve.get_concrete_function()], model)
+
+
+def export_to_tflite(dynamic_range=False):
+    """Convert the Keras LSTM with int8 (or dynamic-range) quantization"""
+    required = (LSTM_MODEL,) if dynamic_range else (LSTM_MODEL, LSTM_SCALER_X, DATA_X_FILE)
+    for path in required:
+        if not os.path.exists(path):
+            print(f"❌ Not found: {path}")
+            print("   Run prepare_timeseries_data.py and train_wave_forecast_lstm.py first!")
+            return False
+    
+    print(f"Loading {LSTM_MODEL}...")
+    model = tf.keras.models.load_model(LSTM_MODEL)
+    
+    converter = _fixed_shape_converter(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    
+    if dynamic_range:
+        print("Dynamic-range quantization (int8 weights, float activations)...")
+        calibration = np.random.default_rng(42).standard_normal((1, 168, 6)).astype(np.float32)
+        tflite_model = converter.convert()
+    else:
+        calibration = load_calibration_windows()
+        print(f"Calibrating on {len(calibration)} windows...")
+        converter.representative_dataset = lambda: ([window[None]] for window in calibration)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        
+        try:
+            tflite_model = converter.convert()
+        except Exception as e:
+            # Some LSTM graphs have ops without int8 kernels; keep those in float
+            print(f"⚠️  Full int8 conversion failed ({e}), allowing float fallback ops")
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+                tf.lite.OpsSet.TFLITE_BUILTINS
+            ]
+            tflite_model = converter.convert()
+    
+    with open(LSTM_TFLITE_MODEL, 'wb') as f:
+        f.write(tflite_model)
+    print(f"✅ Saved: {LSTM_TFLITE_MODEL} ({len(tflite_model) / 1024:.0f} KB)")
+    
+    # Compare against Keras on one window
+    interpreter = tf.lite.Interpreter(model_content=tflite_model)
+    input_detail = interpreter.get_input_details()[0]
+    output_detail = interpreter.get_output_details()[0]
+    interpreter.allocate_tensors()
+    
+    sample = calibration[:1]
+    interpreter.set_tensor(input_detail['index'], sample)
+    interpreter.invoke()
+    tflite_out = interpreter.get_tensor(output_detail['index'])
+    keras_out = model.predict(sample, verbose=0)
+    print(f"✅ Mean abs difference vs Keras (scaled units): {np.mean(np.abs(tflite_out - keras_out)):.4f}")
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the LSTM to TFLite')
+    parser.add_argument('--dynamic-range', action='store_true',
+                        help='Quantize weights only; no calibration data needed')
+    args = parser.parse_args()
+    export_to_tflite(dynamic_range=args.dynamic_range)
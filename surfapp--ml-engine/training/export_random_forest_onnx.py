@@ -0,0 +1,70 @@
+"""
+Export the trained Random Forest to ONNX for faster inference.
+
+models/random_forest.py uses the exported file automatically when onnxruntime
+is installed and the export is newer than the joblib model; sklearn remains
+the fallback. ONNX Runtime walks the trees in native code instead of
+sklearn's per-estimator Python loop.
+
+Requires: pip install skl2onnx onnxruntime
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import RANDOM_FOREST_MODEL, RANDOM_FOREST_ONNX_MODEL, RANDOM_FOREST_ALL_FEATURES
+
+try:
+    import joblib
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    print("❌ joblib and skl2onnx are required!")
+    print("   Install with: pip install skl2onnx onnxruntime")
+    sys.exit(1)
+
+
+def export_to_onnx():
+    """Convert the Random Forest to ONNX and check it matches the sklearn output"""
+    if not os.path.exists(RANDOM_FOREST_MODEL):
+        print(f"❌ Model not found: {RANDOM_FOREST_MODEL}")
+        print("   Run train_model.py first!")
+        return False
+
+    print(f"Loading {RANDOM_FOREST_MODEL}...")
+    model = joblib.load(RANDOM_FOREST_MODEL)
+    if isinstance(model, dict):
+        model = model['model']
+
+    # Dynamic batch dimension; the column order the model was fitted with is
+    # stored in the metadata since the ONNX graph itself has no feature names
+    feature_names = list(getattr(model, 'feature_names_in_', RANDOM_FOREST_ALL_FEATURES))
+    n_features = len(feature_names)
+    onnx_model = convert_sklearn(model, initial_types=[('input', FloatTensorType([None, n_features]))])
+    entry = onnx_model.metadata_props.add()
+    entry.key, entry.value = 'feature_names', ','.join(feature_names)
+    with open(RANDOM_FOREST_ONNX_MODEL, 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"✅ Saved: {RANDOM_FOREST_ONNX_MODEL}")
+
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        print("⚠️  onnxruntime not installed, skipping verification")
+        return True
+
+    # Trees compare float32 thresholds in ONNX, so tiny differences are expected
+    sample = np.abs(np.random.default_rng(42).standard_normal((64, n_features))).astype(np.float32) * 5
+    session = ort.InferenceSession(RANDOM_FOREST_ONNX_MODEL, providers=['CPUExecutionProvider'])
+    onnx_out = session.run(None, {session.get_inputs()[0].name: sample})[0]
+    sklearn_out = model.predict(sample)
+    max_diff = float(np.max(np.abs(onnx_out.reshape(sklearn_out.shape) - sklearn_out)))
+    print(f"✅ Max abs difference vs sklearn: {max_diff:.2e}")
+    return True
+
+
+if __name__ == '__main__':
+    export_to_onnx()
@@ -7,6 +7,13 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+# orjson (optional) parses the multi-MB historical files several times faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configuration
 LOOKBACK_HOURS = 168  # Use past 7 days (168 hours) to predict
 FORECAST_HOURS = 168  # Predict next 7 days (168 hours)
@@ -30,8 +37,8 @@ def prepare_multioutput_sequences(json_file, lookback_hours=168, forecast_hours=
     print(f"\nProcessing {json_file}...")
     
     try:
-        with open(json_file, 'r') as f:
-            data = json.load(f)
+        with open(json_file, 'rb') as f:
+            data = orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
     except FileNotFoundError:
         print(f"Error: File {json_file} not found!")
         return None, None, None
@@ -40,7 +47,6 @@ def prepare_multioutput_sequences(json_file, lookback_hours=168, forecast_hours=
         return None, None, None
     
     # Convert to DataFrame
-    records = []
     hours_data = data.get('hours', [])
     
     if not hours_data:
@@ -49,36 +55,31 @@ def prepare_multioutput_sequences(json_file, lookback_hours=168, forecast_hours=
     
     print(f"  Found {len(hours_data)} hourly records")
     
-    for hour in hours_data:
-        try:
-            records.append({
-                'timestamp': hour['time'],
-                'waveHeight': hour.get('waveHeight', {}).get('sg', 0),
-                'wavePeriod': hour.get('wavePeriod', {}).get('sg', 0),
-                'swellHeight': hour.get('swellHeight', {}).get('sg', 0),
-                'swellPeriod': hour.get('swellPeriod', {}).get('sg', 0),
-                'windSpeed': hour.get('windSpeed', {}).get('sg', 0),
-                'windDirection': hour.get('windDirection', {}).get('sg', 0)
-            })
-        except KeyError as e:
-            print(f"  Warning: Missing key {e} in record, skipping")
-            continue
-    
-    if not records:
+    # Hours without a timestamp cannot be placed in the series
+    skipped = sum('time' not in hour for hour in hours_data)
+    if skipped:
+        print(f"  Warning: {skipped} records missing 'time', skipping")
+        hours_data = [hour for hour in hours_data if 'time' in hour]
+    
+    if not hours_data:
         print(f"Error: No valid records extracted from {json_file}")
         return None, None, None
     
-    df = pd.DataFrame(records)
+    # Column by column (StormGlass 'sg' value, 0 if absent) rather than one
+    # dict per hour; pd.json_normalize would flatten every source of every
+    # parameter and is several times slower on these files
+    columns = {'timestamp': [hour['time'] for hour in hours_data]}
+    for col in FEATURE_COLS:
+        columns[col] = [hour.get(col, {}).get('sg', 0) for hour in hours_data]
+    
+    df = pd.DataFrame(columns)
     df['timestamp'] = pd.to_datetime(df['timestamp'])
     df = df.sort_values('timestamp').reset_index(drop=True)
     
     print(f"  Processed {len(df)} valid records")
     print(f"  Date range: {df['timestamp'].min()} to {df['timestamp'].max()}")
     
-    # Create sequences
-    X_sequences = []  # Past data (input)
-    y_sequences = []  # Future data (output) - ALL parameters
-    
+    # Create sequences: past data (input) and future data (output) - ALL parameters
     total_required = lookback_hours + forecast_hours
     max_sequences = len(df) - total_required
     
@@ -88,21 +89,17 @@ def prepare_multioutput_sequences(json_file, lookback_hours=168, forecast_hours=
     
     print(f"  Creating {max_sequences} training sequences...")
     
-    for i in range(max_sequences):
-        # Input: Past lookback_hours (default: 7 days) of all features
-        X_seq = df.iloc[i:i+lookback_hours][FEATURE_COLS].values
-        
-        # Output: Next forecast_hours (default: 7 days) of ALL features
-        y_seq = df.iloc[i+lookback_hours:i+lookback_hours+forecast_hours][FEATURE_COLS].values
-        
-        X_sequences.append(X_seq)
-        y_sequences.append(y_seq)
-        
-        if (i + 1) % 100 == 0:
-            print(f"    Created {i + 1}/{max_sequences} sequences...")
+    # Every window of total_required consecutive hours as a strided view
+    # (no copy): shape (windows, 6 features, total_required hours).
+    # float32 is what the LSTM trains on, at half the bytes of float64
+    values = df[FEATURE_COLS].to_numpy(dtype=np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view(values, total_required, axis=0)[:max_sequences]
     
-    X_array = np.array(X_sequences)
-    y_array = np.array(y_sequences)
+    # Input: Past lookback_hours (default: 7 days) of all features
+    X_array = np.ascontiguousarray(windows[:, :, :lookback_hours].transpose(0, 2, 1))
+    
+    # Output: Next forecast_hours (default: 7 days) of ALL features
+    y_array = np.ascontiguousarray(windows[:, :, lookback_hours:].transpose(0, 2, 1))
     
     print(f"  ✅ Created {len(X_array)} sequences")
     print(f"     Input shape: {X_array.shape}")
@@ -147,8 +144,21 @@ def main():
     print("COMBINING DATASETS")
     print('=' * 60)
     
-    X_combined = np.vstack([d[0] for d in datasets])
-    y_combined = np.vstack([d[1] for d in datasets])
+    # Written straight into the output .npy files (memory-mapped) instead of
+    # stacking in RAM and saving a second copy
+    output_x = '../artifacts/timeseries_X_multioutput.npy'
+    output_y = '../artifacts/timeseries_y_multioutput.npy'
+    
+    n_samples = sum(len(d[0]) for d in datasets)
+    X_combined = np.lib.format.open_memmap(output_x, mode='w+', dtype=np.float32,
+                                           shape=(n_samples,) + datasets[0][0].shape[1:])
+    y_combined = np.lib.format.open_memmap(output_y, mode='w+', dtype=np.float32,
+                                           shape=(n_samples,) + datasets[0][1].shape[1:])
+    offset = 0
+    for X_spot, y_spot, _ in datasets:
+        X_combined[offset:offset + len(X_spot)] = X_spot
+        y_combined[offset:offset + len(y_spot)] = y_spot
+        offset += len(X_spot)
     
     print(f"\n✅ Combined training sequences: {X_combined.shape}")
     print(f"   Format: (samples, 168 hours, 6 features)")
@@ -173,8 +183,8 @@ def main():
     
     if x_nan > 0 or y_nan > 0:
         print("\n⚠️  Warning: Dataset contains NaN values. Replacing with zeros...")
-        X_combined = np.nan_to_num(X_combined, nan=0.0)
-        y_combined = np.nan_to_num(y_combined, nan=0.0)
+        np.nan_to_num(X_combined, copy=False, nan=0.0)
+        np.nan_to_num(y_combined, copy=False, nan=0.0)
     
     # Statistics
     print(f"\n{'=' * 60}")
@@ -190,12 +200,9 @@ def main():
         print(f"{name:20s}: mean={x_mean:7.2f}, std={x_std:7.2f}, "
               f"min={x_min:7.2f}, max={x_max:7.2f}")
     
-    # Save for training
-    output_x = '../artifacts/timeseries_X_multioutput.npy'
-    output_y = '../artifacts/timeseries_y_multioutput.npy'
-    
-    np.save(output_x, X_combined)
-    np.save(output_y, y_combined)
+    # Save for training (the arrays are the memory-mapped output files)
+    X_combined.flush()
+    y_combined.flush()
     
     print(f"\n{'=' * 60}")
     print("✅ PREPARATION COMPLETE!")
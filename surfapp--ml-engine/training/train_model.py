@@ -5,7 +5,15 @@ import requests
 import sys
 import arrow
 import json
+import warnings
 import numpy as np
+
+# orjson (optional) parses the API responses and historical files several times faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 from dotenv import load_dotenv
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
@@ -27,6 +35,10 @@ FEATURE_NAMES = [
 # These are the multiple outputs the model will predict.
 TARGET_NAMES = ['waveHeight', 'wavePeriod', 'windSpeed', 'windDirection']
 
+# Every parameter to load, de-duplicated (windSpeed/windDirection are both) in a
+# fixed order; a set would reorder them on each interpreter start (hash seed)
+TRAINING_PARAMS = list(dict.fromkeys(FEATURE_NAMES + TARGET_NAMES))
+
 # Engineered features will be added during preprocessing
 ENGINEERED_FEATURES = []
 
@@ -34,14 +46,35 @@ ENGINEERED_FEATURES = []
 SURF_SPOT = {'id': '2', 'name': 'Weligama', 'lat': 5.972, 'lng': 80.426}
 MAX_DAYS_PER_REQUEST = 10 # Stormglass historical data limit
 
-def _get_average_from_sources(source_dict):
+def _numeric_or_nan(value):
+    return value if isinstance(value, (int, float)) else np.nan
+
+def _average_records(hours, params):
     """
-    Averages the values from different weather sources (e.g., sg, noaa, meteo).
-    This creates a more robust single value for each parameter.
+    Averages the values from different weather sources (e.g., sg, noaa, meteo)
+    for every hour and parameter, creating a more robust single value for each.
+    Each parameter becomes one (hours, sources) NaN-padded matrix reduced with
+    np.nanmean, instead of a Python average per hour and parameter.
+    Hours where any parameter has no numeric source are dropped.
     """
-    if not source_dict: return None
-    valid_values = [v for v in source_dict.values() if isinstance(v, (int, float))]
-    return sum(valid_values) / len(valid_values) if valid_values else None
+    averages = np.full((len(hours), len(params)), np.nan)
+    for col, param in enumerate(params):
+        source_dicts = [hour.get(param) or {} for hour in hours]
+        # Sorted: set order changes with PYTHONHASHSEED, and so would the float sums
+        sources = sorted(set().union(*source_dicts))
+        if not sources:
+            continue
+        matrix = np.array(
+            [[_numeric_or_nan(source_dict.get(source)) for source in sources] for source_dict in source_dicts],
+            dtype=np.float64
+        )
+        with warnings.catch_warnings():
+            # All-NaN rows (no valid source this hour) stay NaN and are dropped below
+            warnings.simplefilter('ignore', RuntimeWarning)
+            averages[:, col] = np.nanmean(matrix, axis=1)
+    
+    complete = ~np.isnan(averages).any(axis=1)
+    return pd.DataFrame(averages[complete], columns=list(params))
 
 def fetch_historical_data_for_training():
     """Fetches and processes historical data for both features and targets."""
@@ -54,7 +87,7 @@ def fetch_historical_data_for_training():
     end_date = arrow.utcnow()
     
     # Request all parameters needed for both the features and the targets.
-    all_params = ','.join(list(set(FEATURE_NAMES + TARGET_NAMES)))
+    all_params = ','.join(TRAINING_PARAMS)
     
     try:
         response = requests.get(
@@ -69,7 +102,7 @@ def fetch_historical_data_for_training():
             headers={'Authorization': STORMGLASS_API_KEY}
         )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
         
         if 'hours' not in data or not data['hours']:
             print("Warning: Stormglass API returned no historical data.", file=sys.stderr)
@@ -77,21 +110,8 @@ def fetch_historical_data_for_training():
 
         print(f"Successfully fetched {len(data['hours'])} hourly records for training.", file=sys.stderr)
         
-        # Process the raw hourly data into a clean list of records
-        processed_data = []
-        for hour in data['hours']:
-            record = {}
-            is_valid_record = True
-            for param in all_params.split(','):
-                value = _get_average_from_sources(hour.get(param, {}))
-                if value is None:
-                    is_valid_record = False
-                    break
-                record[param] = value
-            if is_valid_record:
-                processed_data.append(record)
-
-        return pd.DataFrame(processed_data)
+        # Process the raw hourly data into clean records
+        return _average_records(data['hours'], all_params.split(','))
 
     except requests.exceptions.RequestException as e:
         print(f"CRITICAL API ERROR: Could not fetch training data from Stormglass. {e}", file=sys.stderr)
@@ -101,7 +121,7 @@ def load_historical_data_from_files():
     """Load training data from collected JSON files instead of API."""
     print("Loading historical data from local JSON files...", file=sys.stderr)
     
-    all_records = []
+    frames = []
     files = [
         '../data/weligama_historical_data_fixed.json',
         '../data/arugam_bay_historical_data_fixed.json'
@@ -109,30 +129,17 @@ def load_historical_data_from_files():
     
     for filepath in files:
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
             
             if 'hours' not in data or not data['hours']:
                 print(f"Warning: No 'hours' data in {filepath}", file=sys.stderr)
                 continue
             
-            all_params = ','.join(list(set(FEATURE_NAMES + TARGET_NAMES)))
-            
-            for hour in data.get('hours', []):
-                record = {}
-                is_valid = True
-                
-                for param in all_params.split(','):
-                    value = _get_average_from_sources(hour.get(param, {}))
-                    if value is None:
-                        is_valid = False
-                        break
-                    record[param] = value
-                
-                if is_valid:
-                    all_records.append(record)
+            all_params = TRAINING_PARAMS
+            frames.append(_average_records(data['hours'], all_params))
             
-            print(f"  Loaded {len([r for r in all_records])} records from {filepath}", file=sys.stderr)
+            print(f"  Loaded {sum(len(frame) for frame in frames)} records from {filepath}", file=sys.stderr)
         
         except FileNotFoundError:
             print(f"Warning: {filepath} not found, skipping...", file=sys.stderr)
@@ -141,12 +148,13 @@ def load_historical_data_from_files():
             print(f"Error: Invalid JSON in {filepath}", file=sys.stderr)
             continue
     
-    if not all_records:
+    all_records = pd.concat(frames, ignore_index=True) if frames else None
+    if all_records is None or all_records.empty:
         print("Error: No valid training data found in local files", file=sys.stderr)
         return None
     
     print(f"Total records loaded: {len(all_records)}", file=sys.stderr)
-    return pd.DataFrame(all_records)
+    return all_records
 
 def preprocess_data(df):
     """Enhanced preprocessing with feature engineering."""
@@ -323,7 +331,9 @@ def train_model(df):
         'target_names': TARGET_NAMES,
         'engineered_features': ENGINEERED_FEATURES
     }
-    joblib.dump(model_data, MODEL_PATH)
+    # Uncompressed on purpose: the serving side loads it with mmap_mode='r',
+    # which only maps arrays out of an uncompressed file
+    joblib.dump(model_data, MODEL_PATH, compress=0)
     print(f"\n✅ Model saved successfully to '{MODEL_PATH}'", file=sys.stderr)
     
     # Save feature list for reference
@@ -34,6 +34,7 @@ DATA_Y_FILE = '../artifacts/timeseries_y_multioutput.npy'
 MODEL_FILE = '../wave_forecast_multioutput_lstm.keras'  # Save to root (production file)
 SCALER_X_FILE = '../wave_forecast_scaler_X_multioutput.joblib'  # Save to root (production file)
 SCALER_Y_FILE = '../wave_forecast_scaler_y_multioutput.joblib'  # Save to root (production file)
+SCALER_PARAMS_FILE = '../wave_forecast_scalers_multioutput.npz'  # Plain mean/scale arrays, loaded without sklearn at serve time
 FEATURE_NAMES_FILE = '../wave_forecast_feature_names.joblib'  # Save to root (production file)
 
 FEATURE_NAMES = ['Wave Height (m)', 'Wave Period (s)', 'Swell Height (m)', 
@@ -51,8 +52,10 @@ def load_data():
         print(f"   Run prepare_timeseries_data.py first!")
         return None, None
     
-    X = np.load(DATA_X_FILE)
-    y = np.load(DATA_Y_FILE)
+    # Copy-on-write maps: pages are read on demand, and only those the NaN
+    # cleanup below writes to are copied into memory
+    X = np.load(DATA_X_FILE, mmap_mode='c')
+    y = np.load(DATA_Y_FILE, mmap_mode='c')
     
     print(f"\n✅ Loaded data:")
     print(f"   X shape: {X.shape}  (samples, 168 hours input, 6 features)")
@@ -153,6 +156,8 @@ def build_model(n_timesteps_in, n_timesteps_out, n_features):
     print("BUILDING MODEL ARCHITECTURE")
     print("=" * 60)
     
+    # LSTM layers keep the defaults (tanh / sigmoid, no recurrent_dropout,
+    # unroll=False) so GPU training and inference use the fused CuDNN kernel
     model = Sequential([
         # Encoder: Process input sequence (REDUCED SIZE to prevent overfitting)
         LSTM(64, activation='tanh', return_sequences=True, 
@@ -263,17 +268,10 @@ def evaluate_model(model, X_test, y_test, scaler_y):
     n_samples = min(100, len(X_test))
     y_pred_scaled = model.predict(X_test[:n_samples], verbose=0)
     
-    # Inverse transform
-    n_timesteps_out = y_test.shape[1]
-    n_features = y_test.shape[2]
-    
-    y_pred = scaler_y.inverse_transform(
-        y_pred_scaled.reshape(-1, n_features)
-    ).reshape(-1, n_timesteps_out, n_features)
-    
-    y_true = scaler_y.inverse_transform(
-        y_test[:n_samples].reshape(-1, n_features)
-    ).reshape(-1, n_timesteps_out, n_features)
+    # Inverse transform: StandardScaler is x * scale_ + mean_ per feature, which
+    # broadcasts over (samples, 168, 6) without flattening and reshaping back
+    y_pred = y_pred_scaled * scaler_y.scale_ + scaler_y.mean_
+    y_true = y_test[:n_samples] * scaler_y.scale_ + scaler_y.mean_
     
     # Calculate MAE and MAPE for each parameter
     epsilon = 1e-10
@@ -404,11 +402,15 @@ def main():
     
     joblib.dump(scaler_X, SCALER_X_FILE)
     joblib.dump(scaler_y, SCALER_Y_FILE)
+    np.savez(SCALER_PARAMS_FILE,
+             x_mean=scaler_X.mean_, x_scale=scaler_X.scale_,
+             y_mean=scaler_y.mean_, y_scale=scaler_y.scale_)
     joblib.dump(FEATURE_NAMES, FEATURE_NAMES_FILE)
     
     print(f"✅ Saved: {MODEL_FILE}")
     print(f"✅ Saved: {SCALER_X_FILE}")
     print(f"✅ Saved: {SCALER_Y_FILE}")
+    print(f"✅ Saved: {SCALER_PARAMS_FILE}")
     print(f"✅ Saved: {FEATURE_NAMES_FILE}")
     
     # 9. Show sample prediction
@@ -438,6 +440,7 @@ def main():
     print(f"  📁 {MODEL_FILE}")
     print(f"  📁 {SCALER_X_FILE}")
     print(f"  📁 {SCALER_Y_FILE}")
+    print(f"  📁 {SCALER_PARAMS_FILE}")
     print(f"  📁 {FEATURE_NAMES_FILE}")
     print(f"  📊 ../artifacts/training_history_multioutput.png")
     print(f"  📊 ../artifacts/sample_predictions.png")
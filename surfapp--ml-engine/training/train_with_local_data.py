@@ -7,20 +7,32 @@ import pandas as pd
 import json
 import sys
 import random
+
+# orjson (optional) parses the multi-MB historical files several times faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from train_model import (
     train_model, 
     FEATURE_NAMES, 
     TARGET_NAMES,
-    _get_average_from_sources
+    TRAINING_PARAMS,
+    _average_records
 )
 
+# Fixed seed so re-running the script samples (and trains on) the same records
+SAMPLE_SEED = 42
+
 def load_historical_data_from_json(file_path, sample_size=None):
     """Load training data from collected JSON files."""
     print(f"\nLoading {file_path}...", file=sys.stderr)
     
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
         
         if 'hours' not in data or not data['hours']:
             print(f"  Error: No 'hours' data found in {file_path}", file=sys.stderr)
@@ -33,30 +45,15 @@ def load_historical_data_from_json(file_path, sample_size=None):
         # Sample if needed
         if sample_size and total_records > sample_size:
             print(f"  Sampling {sample_size} records...", file=sys.stderr)
-            hours_data = random.sample(hours_data, sample_size)
+            hours_data = random.Random(SAMPLE_SEED).sample(hours_data, sample_size)
         
         # Extract required parameters
-        all_params = set(FEATURE_NAMES + TARGET_NAMES)
-        records = []
-        
-        for hour in hours_data:
-            record = {}
-            is_valid = True
-            
-            for param in all_params:
-                value = _get_average_from_sources(hour.get(param, {}))
-                if value is None:
-                    is_valid = False
-                    break
-                record[param] = value
-            
-            if is_valid:
-                records.append(record)
+        records = _average_records(hours_data, TRAINING_PARAMS)
         
         valid_pct = (len(records) / len(hours_data)) * 100
         print(f"  ✓ Loaded {len(records)} valid records ({valid_pct:.1f}%)", file=sys.stderr)
         
-        return pd.DataFrame(records)
+        return records
     
     except FileNotFoundError:
         print(f"  ❌ File not found: {file_path}", file=sys.stderr)
@@ -1,7 +1,8 @@
 """Python package initialization for utils module"""
 from .api_client import (
     fetch_weather_data_with_rotation,
-    fetch_historical_data_with_rotation
+    fetch_historical_data_with_rotation,
+    enable_background_refresh
 )
 from .data_processor import (
     get_average_from_sources,
@@ -10,6 +11,7 @@ from .data_processor import (
 )
 from .feature_engineering import (
     calculate_engineered_features,
+    build_feature_matrix,
     validate_features
 )
 from .mock_data import (
@@ -22,11 +24,13 @@ from .date_utils import (
     aggregate_hourly_to_daily,
     get_current_timestamp_iso
 )
+from .json_output import write_json
 
 __all__ = [
     # API Client
     'fetch_weather_data_with_rotation',
     'fetch_historical_data_with_rotation',
+    'enable_background_refresh',
     
     # Data Processor
     'get_average_from_sources',
@@ -35,6 +39,7 @@ __all__ = [
     
     # Feature Engineering
     'calculate_engineered_features',
+    'build_feature_matrix',
     'validate_features',
     
     # Mock Data
@@ -45,5 +50,8 @@ __all__ = [
     # Date Utils
     'generate_date_labels',
     'aggregate_hourly_to_daily',
-    'get_current_timestamp_iso'
+    'get_current_timestamp_iso',
+    
+    # JSON Output
+    'write_json'
 ]
@@ -1,20 +1,289 @@
 """StormGlass API Client with Multi-Key Rotation"""
+import atexit
+import glob
+import hashlib
+import json
+import os
 import sys
-from config import get_next_api_key, rotate_to_next_key, get_total_keys, API_TIMEOUT
-from .data_processor import process_stormglass_api_response
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from config import (
+    API_KEYS,
+    NO_API_KEYS_MESSAGE,
+    get_next_api_key,
+    rotate_past_key,
+    get_total_keys,
+    API_TIMEOUT,
+    API_KEY_PROBE_CONCURRENCY,
+    API_KEY_STATE_FILE,
+    HISTORICAL_CACHE_TTL_SECONDS,
+    HISTORICAL_CACHE_STALE_SECONDS,
+    HISTORICAL_CACHE_DIR,
+    WEATHER_CACHE_TTL_SECONDS,
+    WEATHER_CACHE_DIR
+)
+from .data_processor import get_average_from_sources, process_stormglass_api_response
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
     print("Warning: requests library not available. API calls will fail.", file=sys.stderr)
 
+# httpx with the h2 package (optional): HTTP/2 lets concurrent requests share
+# one connection to StormGlass; requests stays the fallback (and is required)
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# orjson (optional) decodes the StormGlass payloads several times faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Shared session: keeps TCP/TLS connections to StormGlass alive across calls
+# (key rotation retries, batched locations, --serve mode)
+_session = None
+_session_lock = threading.Lock()
+
+# Timeouts from either client, for _try_key's log message
+_TIMEOUT_ERRORS = ()
+if REQUESTS_AVAILABLE:
+    _TIMEOUT_ERRORS += (requests.exceptions.Timeout,)
+if HTTP2_AVAILABLE:
+    _TIMEOUT_ERRORS += (httpx.TimeoutException,)
+
+
+def _get_session():
+    """
+    Create the module-level HTTP client on first use (thread-safe).
+    
+    An HTTP/2 httpx.Client when httpx and h2 are installed, otherwise a
+    requests.Session. Both expose .get(url, params=, headers=, timeout=)
+    returning a response with .status_code, .content and .json().
+    """
+    global _session
+    if _session is not None:
+        return _session
+    
+    with _session_lock:
+        if _session is None:
+            if HTTP2_AVAILABLE:
+                # Connection errors are retried by the transport; an HTTP 5xx
+                # falls through to the next key in the rotation
+                _session = httpx.Client(
+                    http2=True,
+                    transport=httpx.HTTPTransport(http2=True, retries=2),
+                    limits=httpx.Limits(max_connections=20)
+                )
+            else:
+                # Transient 5xx are retried in place (they are not key-specific);
+                # 402/429 are left to the key rotation
+                retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504], raise_on_status=False)
+                _session = requests.Session()
+                _session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry))
+                _session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+            atexit.register(_session.close)
+    return _session
+
+
+# Guards read-modify-write of API_KEY_STATE_FILE between probe threads
+_key_state_lock = threading.Lock()
+
+# A 429 is a short-term rate limit, not a spent daily quota: bench the key briefly
+RATE_LIMIT_COOLDOWN_SECONDS = 60
+
+
+def _key_id(api_key):
+    """Short fingerprint so the state file never contains the keys themselves"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def _load_key_state():
+    """
+    Read the persisted key state, dropping cooldowns that have expired.
+    
+    Returns:
+        dict: {'cooldowns': {key_id: unix_ts}, 'last_good': key_id or None}
+    """
+    state = {'cooldowns': {}, 'last_good': None}
+    if not API_KEY_STATE_FILE:
+        return state
+    try:
+        with open(API_KEY_STATE_FILE, 'rb') as f:
+            content = f.read()
+        saved = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+        now = time.time()
+        state['cooldowns'] = {k: ts for k, ts in saved.get('cooldowns', {}).items() if ts > now}
+        state['last_good'] = saved.get('last_good')
+    except (OSError, ValueError, AttributeError):
+        pass
+    return state
+
+
+def _update_key_state(exhausted_key=None, rate_limited_key=None, good_key=None):
+    """
+    Record a key that ran out of quota, was rate limited, or just worked, in the state file.
+    Exhausted keys (402) cool down until the next UTC midnight, when StormGlass resets
+    quotas; rate-limited keys (429) only for RATE_LIMIT_COOLDOWN_SECONDS.
+    """
+    if not API_KEY_STATE_FILE:
+        return
+    with _key_state_lock:
+        state = _load_key_state()
+        if exhausted_key is not None:
+            state['cooldowns'][_key_id(exhausted_key)] = (time.time() // 86400 + 1) * 86400
+        if rate_limited_key is not None:
+            # Never shorten a quota cooldown another process already recorded
+            key_id = _key_id(rate_limited_key)
+            state['cooldowns'][key_id] = max(state['cooldowns'].get(key_id, 0), time.time() + RATE_LIMIT_COOLDOWN_SECONDS)
+        if good_key is not None:
+            state['last_good'] = _key_id(good_key)
+            state['cooldowns'].pop(state['last_good'], None)
+        try:
+            os.makedirs(os.path.dirname(API_KEY_STATE_FILE), exist_ok=True)
+            tmp_path = f"{API_KEY_STATE_FILE}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, API_KEY_STATE_FILE)
+        except OSError as e:
+            print(f"  ⚠️  Could not write API key state: {e}", file=sys.stderr)
+
+
+def _key_order(state):
+    """
+    All keys in the order to try them: starting after the last key that worked
+    (from any process), with keys still cooling down skipped. If every key is
+    cooling down the full pool is returned, since the state may be stale.
+    """
+    total_keys = get_total_keys()
+    start = API_KEYS.index(get_next_api_key())
+    ids = [_key_id(api_key) for api_key in API_KEYS]
+    if state['last_good'] in ids:
+        start = ids.index(state['last_good']) + 1
+    
+    order = [(start + i) % total_keys for i in range(total_keys)]
+    available = [i for i in order if ids[i] not in state['cooldowns']]
+    return [API_KEYS[i] for i in (available or order)]
+
+
+def _try_key(url, params, api_key, key_number, total_keys, description, done):
+    """
+    One StormGlass request with one key (may run on a worker thread).
+    
+    Returns:
+        dict or None: Parsed JSON on HTTP 200, None on any failure (logged)
+    """
+    def log(message):
+        # Single write so concurrent probes do not interleave; quiet once a winner is found
+        if not done.is_set():
+            sys.stderr.write(message + '\n')
+    
+    try:
+        log(f"  Fetching {description} using API Key #{key_number}/{total_keys}...")
+        response = _get_session().get(url, params=params, headers={'Authorization': api_key}, timeout=API_TIMEOUT)
+        
+        if response.status_code == 200:
+            log(f"  ✅ Success with API Key #{key_number}")
+            return orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
+        
+        if response.status_code in [402, 429]:
+            error_name = "Payment Required" if response.status_code == 402 else "Rate Limit"
+            log(f"  ⚠️  API Key #{key_number}: {error_name} ({response.status_code}). Trying next key...")
+            if response.status_code == 402:
+                _update_key_state(exhausted_key=api_key)
+            else:
+                _update_key_state(rate_limited_key=api_key)
+        else:
+            log(f"  ⚠️  API Key #{key_number}: Error {response.status_code}. Trying next key...")
+    
+    except _TIMEOUT_ERRORS:
+        log(f"  ⚠️  API Key #{key_number}: Timeout. Trying next key...")
+    
+    except Exception as e:
+        log(f"  ⚠️  API Key #{key_number}: Error ({e}). Trying next key...")
+    
+    return None
+
+
+def _fetch_with_key_rotation(url, params, description, parse):
+    """
+    Try API keys until one returns data that `parse` accepts.
+    
+    The current key is tried alone first (the common case, costing one request
+    of quota). If it fails, the remaining keys are probed in waves of
+    API_KEY_PROBE_CONCURRENCY concurrent requests, and the first usable response
+    wins; later waves are never sent. Keys another run already found out of
+    quota today (API_KEY_STATE_FILE) are skipped.
+    
+    Args:
+        url: StormGlass endpoint
+        params: Query parameters
+        description: What is being fetched (for logging)
+        parse: Callable(json_data) -> result, or None to move on to the next key
+    
+    Returns:
+        Parsed result or None if every key failed
+    """
+    if not API_KEYS:
+        print(f"  ❌ {NO_API_KEYS_MESSAGE}", file=sys.stderr)
+        return None
+    
+    keys = _key_order(_load_key_state())
+    total_keys = len(keys)
+    if total_keys < get_total_keys():
+        print(f"  Skipping {get_total_keys() - total_keys} API key(s) cooling down (out of quota or rate limited)", file=sys.stderr)
+    
+    done = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=max(1, API_KEY_PROBE_CONCURRENCY))
+    try:
+        tried = 0
+        while tried < total_keys:
+            wave_size = 1 if tried == 0 else max(1, API_KEY_PROBE_CONCURRENCY)
+            wave = keys[tried:tried + wave_size]
+            futures = {
+                pool.submit(_try_key, url, params, api_key, tried + i + 1, total_keys, description, done): api_key
+                for i, api_key in enumerate(wave)
+            }
+            tried += len(wave)
+            
+            for future in as_completed(futures):
+                data = future.result()
+                if data is None:
+                    continue
+                
+                result = parse(data)
+                if result is None:
+                    print("  ⚠️  API response has no usable data. Trying next key...", file=sys.stderr)
+                    continue
+                
+                # Spread load: the key after the winner is next in line
+                done.set()
+                rotate_past_key(futures[future])
+                _update_key_state(good_key=futures[future])
+                return result
+    finally:
+        # Do not wait for losing in-flight requests of the last wave
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    print(f"  ❌ All {total_keys} API keys exhausted.", file=sys.stderr)
+    return None
+
 
 def fetch_weather_data_with_rotation(lat, lng, hours_ahead=48, feature_names=None):
     """
     Fetch future weather data from StormGlass API with intelligent key rotation.
-    Tries all available API keys in sequence until one succeeds.
+    Tries the current key, then probes the remaining keys concurrently until one succeeds.
     
     Args:
         lat: Latitude
@@ -42,6 +311,14 @@ def fetch_weather_data_with_rotation(lat, lng, hours_ahead=48, feature_names=Non
     start_time = datetime.now(timezone.utc)
     end_time = start_time + timedelta(hours=hours_ahead)
     
+    cache_path = None
+    if WEATHER_CACHE_TTL_SECONDS > 0:
+        cache_path = _weather_cache_path(lat, lng, hours_ahead, feature_names, start_time)
+        cached = _load_cached_weather(cache_path)
+        if cached is not None:
+            print(f"  ✅ Using cached {hours_ahead}h forecast", file=sys.stderr)
+            return cached, True
+    
     url = "https://api.stormglass.io/v2/weather/point"
     params = {
         'lat': lat,
@@ -51,74 +328,165 @@ def fetch_weather_data_with_rotation(lat, lng, hours_ahead=48, feature_names=Non
         'params': ','.join(feature_names)
     }
     
-    # Try all API keys in rotation
-    total_keys = get_total_keys()
-    keys_tried = 0
+    def first_hour_features(data):
+        # Process response into feature dictionary
+        hours = data.get('hours', [])
+        if not hours:
+            return None
+        first_hour = hours[0]
+        return {
+            feature: get_average_from_sources(first_hour.get(feature, {}), default=0.0)
+            for feature in feature_names
+        }
+    
+    features = _fetch_with_key_rotation(url, params, f"{hours_ahead}h forecast", first_hour_features)
+    if features is None:
+        return {}, False
     
-    while keys_tried < total_keys:
-        api_key = get_next_api_key()
-        key_number = keys_tried + 1
+    if cache_path is not None:
+        _save_cached_weather(cache_path, features)
+    return features, True
+
+
+def _weather_cache_path(lat, lng, hours_ahead, feature_names, start_time):
+    """Cache file for this request; the UTC hour is part of the key"""
+    key = f"{lat:.3f}_{lng:.3f}_{hours_ahead}_{start_time:%Y%m%d%H}_{'-'.join(feature_names)}"
+    return os.path.join(WEATHER_CACHE_DIR, f"{key}.json")
+
+
+def _load_cached_weather(cache_path):
+    """
+    Read a cache entry younger than WEATHER_CACHE_TTL_SECONDS.
+    
+    Returns:
+        dict or None on miss/expiry/corruption
+    """
+    try:
+        if time.time() - os.path.getmtime(cache_path) >= WEATHER_CACHE_TTL_SECONDS:
+            return None
+        with open(cache_path, 'rb') as f:
+            return orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_weather(cache_path, features):
+    """Atomically store the features and drop expired entries"""
+    try:
+        os.makedirs(WEATHER_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(features, f)
+        os.replace(tmp_path, cache_path)
         
-        headers = {'Authorization': api_key}
+        cutoff = time.time() - WEATHER_CACHE_TTL_SECONDS
+        for entry in glob.glob(os.path.join(WEATHER_CACHE_DIR, '*.json')):
+            try:
+                if os.path.getmtime(entry) < cutoff:
+                    os.remove(entry)
+            except FileNotFoundError:
+                pass  # Removed by a concurrent fetch
+    except OSError as e:
+        print(f"  ⚠️  Could not write weather cache: {e}", file=sys.stderr)
+
+
+def _historical_cache_path(lat, lng, hours, feature_names):
+    """Cache file for this request (freshness is judged by the file's mtime)"""
+    key = f"{lat:.3f}_{lng:.3f}_{hours}_{'-'.join(feature_names)}"
+    return os.path.join(HISTORICAL_CACHE_DIR, f"{key}.npz")
+
+
+def _load_cached_historical(cache_path):
+    """
+    Read a cache entry.
+    
+    Returns:
+        tuple: (array, age_seconds), or (None, None) on miss/corruption
+    """
+    try:
+        age = time.time() - os.path.getmtime(cache_path)
+        with np.load(cache_path) as cached:
+            return cached['data'], age
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+def _save_cached_historical(cache_path, data):
+    """Atomically store the processed array and drop entries past the stale window"""
+    try:
+        os.makedirs(HISTORICAL_CACHE_DIR, exist_ok=True)
+        # Own temp file per process and thread: a background refresh and a foreground
+        # fetch of the same entry may both be writing it
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, data=data)
+        os.replace(tmp_path, cache_path)
         
+        cutoff = time.time() - HISTORICAL_CACHE_STALE_SECONDS
+        for entry in glob.glob(os.path.join(HISTORICAL_CACHE_DIR, '*.npz')):
+            try:
+                if os.path.getmtime(entry) < cutoff:
+                    os.remove(entry)
+            except FileNotFoundError:
+                pass  # Removed by a concurrent save
+    except OSError as e:
+        print(f"  ⚠️  Could not write historical cache: {e}", file=sys.stderr)
+
+
+# Stale-while-revalidate needs a process that outlives the response, so
+# background refresh is only switched on by long-lived callers (--serve mode)
+_background_refresh = False
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def enable_background_refresh(enabled=True):
+    """Serve stale cache entries immediately and refresh them on a background thread"""
+    global _background_refresh
+    _background_refresh = enabled
+
+
+def _refresh_in_background(cache_path, lat, lng, hours, feature_names):
+    """Start at most one refresh thread per cache entry"""
+    with _refreshing_lock:
+        if cache_path in _refreshing:
+            return
+        _refreshing.add(cache_path)
+    
+    def refresh():
         try:
-            print(f"  Fetching {hours_ahead}h forecast using API Key #{key_number}/{total_keys}...", file=sys.stderr)
-            response = requests.get(url, params=params, headers=headers, timeout=API_TIMEOUT)
-            
-            if response.status_code == 200:
-                print(f"  ✅ Success with API Key #{key_number}", file=sys.stderr)
-                data = response.json()
-                
-                # Process response into feature dictionary
-                hours = data.get('hours', [])
-                if hours:
-                    first_hour = hours[0]
-                    from .data_processor import get_average_from_sources
-                    
-                    features = {}
-                    for feature in feature_names:
-                        features[feature] = get_average_from_sources(
-                            first_hour.get(feature, {}),
-                            default=0.0
-                        )
-                    
-                    # Rotate to next key for future requests
-                    rotate_to_next_key()
-                    return features, True
-                else:
-                    print(f"  ⚠️  API response has no data. Trying next key...", file=sys.stderr)
-                    rotate_to_next_key()
-                    keys_tried += 1
-                    continue
-            
-            elif response.status_code in [402, 429]:
-                error_name = "Payment Required" if response.status_code == 402 else "Rate Limit"
-                print(f"  ⚠️  API Key #{key_number}: {error_name} ({response.status_code}). Trying next key...", file=sys.stderr)
-                rotate_to_next_key()
-                keys_tried += 1
-                continue
-            
-            else:
-                print(f"  ⚠️  API Key #{key_number}: Error {response.status_code}. Trying next key...", file=sys.stderr)
-                rotate_to_next_key()
-                keys_tried += 1
-                continue
-        
-        except requests.exceptions.Timeout:
-            print(f"  ⚠️  API Key #{key_number}: Timeout. Trying next key...", file=sys.stderr)
-            rotate_to_next_key()
-            keys_tried += 1
-            continue
-        
-        except Exception as e:
-            print(f"  ⚠️  API Key #{key_number}: Error ({e}). Trying next key...", file=sys.stderr)
-            rotate_to_next_key()
-            keys_tried += 1
-            continue
+            _fetch_historical_from_api(lat, lng, hours, feature_names, cache_path)
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(cache_path)
     
-    # All keys exhausted
-    print(f"  ❌ All {total_keys} API keys exhausted.", file=sys.stderr)
-    return {}, False
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def _fetch_historical_from_api(lat, lng, hours, feature_names, cache_path):
+    """Download and process the window; store it in the cache on success"""
+    from datetime import datetime, timedelta, timezone
+    
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(hours=hours)
+    
+    url = "https://api.stormglass.io/v2/weather/point"
+    params = {
+        'lat': lat,
+        'lng': lng,
+        'start': int(start_time.timestamp()),
+        'end': int(end_time.timestamp()),
+        'params': ','.join(feature_names)
+    }
+    
+    result = _fetch_with_key_rotation(
+        url, params, f"{hours}h historical data",
+        lambda data: process_stormglass_api_response(data, feature_names)
+    )
+    
+    if result is not None and cache_path is not None:
+        _save_cached_historical(cache_path, result)
+    return result
 
 
 def fetch_historical_data_with_rotation(lat, lng, hours=168, feature_names=None):
@@ -126,6 +494,11 @@ def fetch_historical_data_with_rotation(lat, lng, hours=168, feature_names=None)
     Fetch historical weather data from StormGlass API with key rotation.
     Used for LSTM model that needs recent time-series data.
     
+    Results are cached on disk: entries younger than HISTORICAL_CACHE_TTL_SECONDS
+    are returned directly; entries younger than HISTORICAL_CACHE_STALE_SECONDS are
+    returned if the API fails (or immediately, with a background refresh, when
+    enable_background_refresh() is on).
+    
     Args:
         lat: Latitude
         lng: Longitude
@@ -142,65 +515,26 @@ def fetch_historical_data_with_rotation(lat, lng, hours=168, feature_names=None)
         feature_names = ['waveHeight', 'swellHeight', 'swellPeriod',
                         'windSpeed', 'windDirection', 'seaLevel']
     
-    from datetime import datetime, timedelta, timezone
-    
-    end_time = datetime.now(timezone.utc)
-    start_time = end_time - timedelta(hours=hours)
-    
-    url = "https://api.stormglass.io/v2/weather/point"
-    params = {
-        'lat': lat,
-        'lng': lng,
-        'start': int(start_time.timestamp()),
-        'end': int(end_time.timestamp()),
-        'params': ','.join(feature_names)
-    }
-    
-    total_keys = get_total_keys()
-    keys_tried = 0
-    
-    while keys_tried < total_keys:
-        api_key = get_next_api_key()
-        key_number = keys_tried + 1
+    cache_path = None
+    cached, age = None, None
+    if HISTORICAL_CACHE_TTL_SECONDS > 0:
+        cache_path = _historical_cache_path(lat, lng, hours, feature_names)
+        cached, age = _load_cached_historical(cache_path)
+        if cached is not None and age >= HISTORICAL_CACHE_STALE_SECONDS:
+            cached = None
         
-        headers = {'Authorization': api_key}
+        if cached is not None and age < HISTORICAL_CACHE_TTL_SECONDS:
+            print(f"  ✅ Using cached {hours}h historical data", file=sys.stderr)
+            return cached
         
-        try:
-            print(f"  Fetching {hours}h historical data using API Key #{key_number}/{total_keys}...", file=sys.stderr)
-            response = requests.get(url, params=params, headers=headers, timeout=API_TIMEOUT)
-            
-            if response.status_code == 200:
-                print(f"  ✅ Success with API Key #{key_number}", file=sys.stderr)
-                data = response.json()
-                result = process_stormglass_api_response(data, feature_names)
-                
-                if result is not None:
-                    rotate_to_next_key()
-                    return result
-                else:
-                    print(f"  ⚠️  Failed to process response. Trying next key...", file=sys.stderr)
-                    rotate_to_next_key()
-                    keys_tried += 1
-                    continue
-            
-            elif response.status_code in [402, 429]:
-                error_name = "Payment Required" if response.status_code == 402 else "Rate Limit"
-                print(f"  ⚠️  API Key #{key_number}: {error_name}. Trying next key...", file=sys.stderr)
-                rotate_to_next_key()
-                keys_tried += 1
-                continue
-            
-            else:
-                print(f"  ⚠️  API Key #{key_number}: Error {response.status_code}. Trying next key...", file=sys.stderr)
-                rotate_to_next_key()
-                keys_tried += 1
-                continue
-        
-        except Exception as e:
-            print(f"  ⚠️  API Key #{key_number}: Error ({e}). Trying next key...", file=sys.stderr)
-            rotate_to_next_key()
-            keys_tried += 1
-            continue
+        if cached is not None and _background_refresh:
+            print(f"  ✅ Using stale cached {hours}h historical data ({age / 3600:.1f}h old), refreshing in background", file=sys.stderr)
+            _refresh_in_background(cache_path, lat, lng, hours, feature_names)
+            return cached
     
-    print(f"  ❌ All {total_keys} API keys exhausted.", file=sys.stderr)
-    return None
+    result = _fetch_historical_from_api(lat, lng, hours, feature_names, cache_path)
+    
+    if result is None and cached is not None:
+        print(f"  ⚠️  API unavailable, using stale cached {hours}h historical data ({age / 3600:.1f}h old)", file=sys.stderr)
+        return cached
+    return result
@@ -1,6 +1,11 @@
 """Data Processing Utilities"""
+import math
+import warnings
 import numpy as np
 
+# Preferred sources in order (sg = StormGlass combined model)
+SOURCE_PRIORITY = ('sg', 'noaa', 'icon', 'meteo', 'fcoo', 'meto')
+
 def get_average_from_sources(source_dict, default=0.0):
     """
     Extract numeric value from StormGlass API source dictionary.
@@ -16,29 +21,32 @@ def get_average_from_sources(source_dict, default=0.0):
     if not isinstance(source_dict, dict):
         return default
     
-    # Preferred sources in order (sg = StormGlass combined model)
-    source_priority = ['sg', 'noaa', 'icon', 'meteo', 'fcoo', 'meto']
-    
-    values = []
-    for source in source_priority:
-        if source in source_dict:
-            val = source_dict[source]
-            if val is not None and not np.isnan(val):
-                try:
-                    values.append(float(val))
-                except (ValueError, TypeError):
-                    continue
+    # Deliberately plain Python: one dict holds a handful of sources, and
+    # np.fromiter + np.nanmean cost several times this loop at that size.
+    # Many hours at once go through the np.nanmean path in
+    # process_stormglass_api_response instead.
+    values = _numeric_values(source_dict.get(source) for source in SOURCE_PRIORITY)
     
     # If specific sources not found, try all keys
     if not values:
-        for key, val in source_dict.items():
-            if val is not None and not np.isnan(val):
-                try:
-                    values.append(float(val))
-                except (ValueError, TypeError):
-                    continue
+        values = _numeric_values(source_dict.values())
     
-    return np.mean(values) if values else default
+    return sum(values) / len(values) if values else default
+
+
+def _numeric_values(candidates):
+    """Floats among candidates, skipping None, NaN and non-numeric values (math.isnan, not np.isnan, on scalars)"""
+    values = []
+    for val in candidates:
+        if val is None:
+            continue
+        try:
+            val = float(val)
+        except (ValueError, TypeError):
+            continue
+        if not math.isnan(val):
+            values.append(val)
+    return values
 
 
 def process_stormglass_api_response(api_response, feature_names):
@@ -57,15 +65,33 @@ def process_stormglass_api_response(api_response, feature_names):
     if not hours:
         return None
     
-    feature_data = []
-    for hour in hours:
-        row = []
-        for feature in feature_names:
-            value = get_average_from_sources(hour.get(feature, {}), default=0.0)
-            row.append(value)
-        feature_data.append(row)
+    # Column-wise: one (hours, sources) float matrix per feature, missing/None -> NaN.
+    # Same rule as get_average_from_sources: mean of the preferred sources,
+    # else mean of any source reported, else 0.0
+    out = np.empty((len(hours), len(feature_names)))
+    for col, feature in enumerate(feature_names):
+        source_dicts = [hour.get(feature) or {} for hour in hours]
+        sources = set().union(*source_dicts)
+        preferred = [source for source in SOURCE_PRIORITY if source in sources]
+        
+        values = np.full(len(hours), np.nan)
+        with warnings.catch_warnings():
+            # nanmean warns on hours where every source is missing; those stay NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if preferred:
+                values = np.nanmean(_source_matrix(source_dicts, preferred), axis=1)
+            missing = np.isnan(values)
+            if missing.any() and sources:
+                fallback = np.nanmean(_source_matrix(source_dicts, sorted(sources)), axis=1)
+                values[missing] = fallback[missing]
+        out[:, col] = values
     
-    return np.array(feature_data)
+    return np.nan_to_num(out, copy=False, nan=0.0)
+
+
+def _source_matrix(source_dicts, sources):
+    """(hours, len(sources)) float array of the given sources; absent or None -> NaN"""
+    return np.array([[d.get(source) for source in sources] for d in source_dicts], dtype=float)
 
 
 def sanitize_prediction(prediction_dict):
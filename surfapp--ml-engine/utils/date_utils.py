@@ -1,6 +1,8 @@
 """Date and Time Utilities"""
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
+
 def generate_date_labels(days=7):
     """
     Generate date labels for forecast charts starting from today.
@@ -30,49 +32,47 @@ def generate_date_labels(days=7):
     return labels
 
 
-def aggregate_hourly_to_daily(hourly_data, hours_per_day=24):
+# Column order of hourly arrays, matching the LSTM output layout
+DAILY_FIELDS = ('waveHeight', 'wavePeriod', 'swellHeight', 'swellPeriod', 'windSpeed', 'windDirection')
+
+# Fallback daily values if insufficient data
+DEFAULT_DAILY_VALUES = (1.0, 10.0, 0.8, 12.0, 15.0, 180.0)
+
+
+def aggregate_hourly_to_daily(hourly_data, hours_per_day=24, as_columns=False):
     """
     Aggregate hourly forecast data into daily averages.
     
     Args:
-        hourly_data: List of hourly forecast dictionaries
+        hourly_data: np.array of shape (hours, 6) in DAILY_FIELDS order,
+                     or list of hourly forecast dictionaries
         hours_per_day: Number of hours per day (default 24)
+        as_columns: Return {field: [7 daily values]} instead of one dict per day
     
     Returns:
-        list: Daily forecast dictionaries (7 days)
+        list: Daily forecast dictionaries (7 days), or dict of lists if as_columns
     """
-    daily_forecast = []
+    if isinstance(hourly_data, np.ndarray):
+        values = hourly_data[:7 * hours_per_day]
+    else:
+        values = np.array(
+            [[h[field] for field in DAILY_FIELDS] for h in hourly_data[:7 * hours_per_day]],
+            dtype=float
+        ).reshape(-1, len(DAILY_FIELDS))
     
-    for day in range(7):
-        start_idx = day * hours_per_day
-        end_idx = start_idx + hours_per_day
-        day_hours = hourly_data[start_idx:end_idx]
-        
-        if not day_hours:
-            # Fallback if insufficient data
-            daily_forecast.append({
-                'waveHeight': 1.0,
-                'wavePeriod': 10.0,
-                'swellHeight': 0.8,
-                'swellPeriod': 12.0,
-                'windSpeed': 15.0,
-                'windDirection': 180.0
-            })
-            continue
-        
-        # Calculate daily averages
-        daily_avg = {
-            'waveHeight': round(sum(h['waveHeight'] for h in day_hours) / len(day_hours), 1),
-            'wavePeriod': round(sum(h['wavePeriod'] for h in day_hours) / len(day_hours), 1),
-            'swellHeight': round(sum(h['swellHeight'] for h in day_hours) / len(day_hours), 1),
-            'swellPeriod': round(sum(h['swellPeriod'] for h in day_hours) / len(day_hours), 1),
-            'windSpeed': round(sum(h['windSpeed'] for h in day_hours) / len(day_hours), 1),
-            'windDirection': round(sum(h['windDirection'] for h in day_hours) / len(day_hours), 1)
-        }
-        
-        daily_forecast.append(daily_avg)
+    # Full days in one reshape + mean; a trailing partial day is averaged on its own
+    full_days = len(values) // hours_per_day
+    daily = values[:full_days * hours_per_day].reshape(full_days, hours_per_day, values.shape[1]).mean(axis=1)
+    if full_days < 7 and len(values) > full_days * hours_per_day:
+        daily = np.vstack([daily, values[full_days * hours_per_day:].mean(axis=0)])
+    
+    daily = np.round(daily, 1)
+    if len(daily) < 7:
+        daily = np.vstack([daily, np.tile(DEFAULT_DAILY_VALUES, (7 - len(daily), 1))])
     
-    return daily_forecast
+    if as_columns:
+        return {field: daily[:, i].tolist() for i, field in enumerate(DAILY_FIELDS)}
+    return [dict(zip(DAILY_FIELDS, day)) for day in daily.tolist()]
 
 
 def get_current_timestamp_iso():
@@ -1,6 +1,7 @@
 """Feature Engineering Functions - CRITICAL: Must match training exactly"""
 import numpy as np
 import pandas as pd
+from config import RANDOM_FOREST_BASE_FEATURES
 
 def calculate_engineered_features(input_df):
     """
@@ -25,25 +26,68 @@ def calculate_engineered_features(input_df):
     4. windSwellInteraction = windSpeed × swellHeight (wind impact on waves)
     5. periodRatio = swellPeriod / (secondarySwellPeriod + 1) (swell dominance)
     """
-    # Make a copy to avoid modifying original
-    df = input_df.copy()
+    # Plain arrays: every Series op on a small frame costs far more in pandas
+    # bookkeeping than in arithmetic
+    swell_height = input_df['swellHeight'].to_numpy()
+    swell_period = input_df['swellPeriod'].to_numpy()
+    wind_speed = input_df['windSpeed'].to_numpy()
     
-    # 1. Swell energy (height² × period)
-    df['swellEnergy'] = (df['swellHeight'] ** 2) * df['swellPeriod']
+    engineered = {
+        # 1. Swell energy (height² × period)
+        'swellEnergy': swell_height * swell_height * swell_period,
+        # 2. Offshore wind factor (for south coast Sri Lanka, offshore ≈ 270°)
+        'offshoreWind': wind_speed * np.cos(np.radians(input_df['windDirection'].to_numpy() - 270)),
+        # 3. Combined swell height
+        'totalSwellHeight': swell_height + input_df['secondarySwellHeight'].to_numpy(),
+        # 4. Wind-swell interaction
+        'windSwellInteraction': wind_speed * swell_height,
+        # 5. Period ratio
+        'periodRatio': swell_period / (input_df['secondarySwellPeriod'].to_numpy() + 1)
+    }
     
-    # 2. Offshore wind factor (for south coast Sri Lanka, offshore ≈ 270°)
-    df['offshoreWind'] = df['windSpeed'] * np.cos(np.radians(df['windDirection'] - 270))
+    # Recomputing columns that already exist: keep their positions, as before
+    if input_df.columns.intersection(list(engineered)).size:
+        return input_df.assign(**engineered)
     
-    # 3. Combined swell height
-    df['totalSwellHeight'] = df['swellHeight'] + df['secondarySwellHeight']
+    # New frame with the 5 columns appended in one step (the input is not modified)
+    return pd.concat([input_df, pd.DataFrame(engineered, index=input_df.index)], axis=1)
+
+
+def build_feature_matrix(features_list):
+    """
+    Build the Random Forest input matrix straight from feature dictionaries.
     
-    # 4. Wind-swell interaction
-    df['windSwellInteraction'] = df['windSpeed'] * df['swellHeight']
+    Same calculations as calculate_engineered_features, but on a plain ndarray:
+    for the handful of rows served per request, DataFrame construction costs
+    more than the model itself.
     
-    # 5. Period ratio
-    df['periodRatio'] = df['swellPeriod'] / (df['secondarySwellPeriod'] + 1)
+    Args:
+        features_list: List of dictionaries with the 10 base features
+                       (missing values become NaN, as with pd.DataFrame)
+    
+    Returns:
+        np.array: float32 matrix (N, 15) in RANDOM_FOREST_ALL_FEATURES order
+    """
+    n_rows, n_base = len(features_list), len(RANDOM_FOREST_BASE_FEATURES)
+    # Flat fromiter fill: no nested lists for np.array to inspect
+    base = np.fromiter(
+        (features.get(name, np.nan) for features in features_list for name in RANDOM_FOREST_BASE_FEATURES),
+        dtype=np.float64,
+        count=n_rows * n_base
+    ).reshape(n_rows, n_base)
+    (swell_height, swell_period, _, wind_speed, wind_direction,
+     _, _, secondary_height, secondary_period, _) = base.T
     
-    return df
+    # Engineered features in float64 (as the pandas path), then one cast to the
+    # float32 the tree ensemble compares against
+    X = np.empty((n_rows, n_base + 5), dtype=np.float32)
+    X[:, :n_base] = base
+    X[:, 10] = swell_height * swell_height * swell_period
+    X[:, 11] = wind_speed * np.cos(np.radians(wind_direction - 270))
+    X[:, 12] = swell_height + secondary_height
+    X[:, 13] = wind_speed * swell_height
+    X[:, 14] = swell_period / (secondary_period + 1)
+    return X
 
 
 def validate_features(features_dict, required_features):
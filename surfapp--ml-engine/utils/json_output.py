@@ -0,0 +1,27 @@
+"""JSON Output for the Node.js-facing CLI services"""
+import sys
+import json
+
+# orjson (optional) serializes the response several times faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def write_json(payload):
+    """
+    Write one compact JSON document + newline to stdout.
+
+    With orjson the bytes go straight to the stdout buffer, skipping print's
+    str round-trip and the separate UTF-8 encode.
+
+    Args:
+        payload: JSON-serializable object (numpy arrays/scalars allowed with orjson)
+    """
+    if ORJSON_AVAILABLE:
+        sys.stdout.buffer.write(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
+    else:
+        sys.stdout.write(json.dumps(payload, separators=(',', ':')) + '\n')
+    sys.stdout.flush()
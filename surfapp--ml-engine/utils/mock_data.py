@@ -1,6 +1,58 @@
 """Mock Data Generation for Testing and Fallback"""
-import random
 import numpy as np
+from config import MOCK_DATA_SEED
+
+# Single PCG64 generator shared by all mock functions; draws are taken as arrays
+_rng = np.random.default_rng(MOCK_DATA_SEED)
+
+
+def _cycle_tables(hours):
+    """Deterministic hourly cycles shared by the mock generators"""
+    hour = np.arange(hours)
+    return {
+        # Daily cycle (stronger in afternoon)
+        'daily': 0.1 * np.sin(2 * np.pi * hour / 24),
+        # Multi-day swell cycle (3-day period)
+        'swell': 0.3 * np.sin(2 * np.pi * hour / 72),
+        # Wind varies with time of day (stronger in afternoon)
+        'wind': 3.0 * (0.5 + 0.5 * np.sin(2 * np.pi * (hour - 6) / 24)),
+        # Trend damping, exponential decay over 3 days
+        'damping': np.exp(-hour / 72)
+    }
+
+
+# Precomputed for the standard 7-day window; other lengths are computed on demand.
+# Shared across calls, so read-only: an accidental in-place update raises instead
+# of corrupting every later forecast.
+_CYCLES_168 = _cycle_tables(168)
+for _table in _CYCLES_168.values():
+    _table.flags.writeable = False
+del _table
+
+
+def _cycles(hours):
+    """Cycle tables for `hours` hours (sliced from the 168h tables when possible)"""
+    if hours == 168:
+        return _CYCLES_168
+    if hours < 168:
+        return {name: table[:hours] for name, table in _CYCLES_168.items()}
+    return _cycle_tables(hours)
+
+
+# Full width of the uniform noise on each jittered column of the mock time series
+_JITTER_WIDTHS = np.array([0.3, 2.0, 1.0, 4.0, 30.0])
+
+# Lower bounds per feature; windDirection is left unbounded
+_TIMESERIES_FLOORS = np.array([0.3, 6.0, 0.2, 8.0, 5.0, -np.inf])
+
+# Bounds for extrapolated forecasts; windDirection wraps instead of clamping
+_FORECAST_LOWER = np.array([0.3, 6.0, 0.2, 8.0, 5.0, -np.inf])
+_FORECAST_UPPER = np.array([5.0, 20.0, 4.0, 18.0, 40.0, np.inf])
+
+
+def _uniform(low, high):
+    """Scalar draw between low and high; like random.uniform, accepts high < low"""
+    return float(low + (high - low) * _rng.random())
 
 def generate_mock_spot_forecast(spot_info):
     """
@@ -20,27 +72,27 @@ def generate_mock_spot_forecast(spot_info):
     # Region-specific base conditions
     if is_east_coast:
         base_wave = 1.2
-        wave_variation = random.uniform(-0.4, 0.6)
+        wave_variation = _uniform(-0.4, 0.6)
         wind_range = (8, 25)
         wind_dir_range = (250, 290)  # Westerly winds
     elif is_south_coast:
         base_wave = 1.0
-        wave_variation = random.uniform(-0.3, 0.5)
+        wave_variation = _uniform(-0.3, 0.5)
         wind_range = (5, 20)
         wind_dir_range = (180, 220)  # South/SW winds
     else:
         # West coast or unknown
         base_wave = 0.8
-        wave_variation = random.uniform(-0.2, 0.4)
+        wave_variation = _uniform(-0.2, 0.4)
         wind_range = (5, 18)
         wind_dir_range = (330, 30)  # NW/North winds
     
     return {
         'waveHeight': round(max(0.3, base_wave + wave_variation), 1),
-        'wavePeriod': round(random.uniform(8, 13), 1),
-        'windSpeed': round(random.uniform(*wind_range), 1),
-        'windDirection': round(random.uniform(*wind_dir_range), 1),
-        'tide': {'status': random.choice(['Low', 'Mid', 'High'])}
+        'wavePeriod': round(_uniform(8, 13), 1),
+        'windSpeed': round(_uniform(*wind_range), 1),
+        'windDirection': round(_uniform(*wind_dir_range), 1),
+        'tide': {'status': ('Low', 'Mid', 'High')[_rng.integers(3)]}
     }
 
 
@@ -86,35 +138,28 @@ def generate_mock_timeseries_data(lat, lng, hours=168):
         base_wind = 12.0
         base_wind_dir = 180.0
     
-    # Generate realistic time-series with trends and cycles
-    data = []
-    
-    # Create a realistic trend (simulating swell cycle)
-    trend_period = 72  # 3-day cycle
-    
-    for hour in range(hours):
-        # Daily cycle (stronger in afternoon)
-        daily_cycle = 0.1 * np.sin(2 * np.pi * hour / 24)
-        
-        # Multi-day swell cycle
-        swell_cycle = 0.3 * np.sin(2 * np.pi * hour / trend_period)
-        
-        # Random variation
-        noise = random.uniform(-0.15, 0.15)
-        
-        # Wind varies with time of day (stronger in afternoon)
-        wind_cycle = 3.0 * (0.5 + 0.5 * np.sin(2 * np.pi * (hour - 6) / 24))
-        
-        data.append([
-            max(0.3, base_wave + swell_cycle + daily_cycle + noise),  # waveHeight
-            max(6.0, base_period + swell_cycle * 2 + random.uniform(-1, 1)),  # wavePeriod
-            max(0.2, base_swell + swell_cycle + noise * 0.5),  # swellHeight
-            max(8.0, base_swell_period + swell_cycle * 1.5 + random.uniform(-0.5, 0.5)),  # swellPeriod
-            max(5.0, base_wind + wind_cycle + random.uniform(-2, 2)),  # windSpeed
-            base_wind_dir + random.uniform(-15, 15)  # windDirection
-        ])
-    
-    return np.array(data)
+    # Daily, multi-day swell (3-day trend) and wind cycles
+    cycles = _cycles(hours)
+    daily_cycle = cycles['daily']
+    swell_cycle = cycles['swell']
+    wind_cycle = cycles['wind']
+    
+    # Random variation: one (hours, 5) draw scaled to +/- half-width per column
+    # [wave noise, wavePeriod, swellPeriod, windSpeed, windDirection]
+    jitter = _rng.random((hours, 5))
+    jitter -= 0.5
+    jitter *= _JITTER_WIDTHS
+    noise = jitter[:, 0]
+    
+    data = np.empty((hours, 6))
+    data[:, 0] = base_wave + swell_cycle + daily_cycle + noise  # waveHeight
+    data[:, 1] = base_period + swell_cycle * 2 + jitter[:, 1]  # wavePeriod
+    data[:, 2] = base_swell + swell_cycle + noise * 0.5  # swellHeight
+    data[:, 3] = base_swell_period + swell_cycle * 1.5 + jitter[:, 2]  # swellPeriod
+    data[:, 4] = base_wind + wind_cycle + jitter[:, 3]  # windSpeed
+    data[:, 5] = base_wind_dir + jitter[:, 4]  # windDirection
+    
+    return np.maximum(data, _TIMESERIES_FLOORS, out=data)
 
 
 def generate_forecast_from_trend_extrapolation(recent_data, hours_ahead=168):
@@ -138,30 +183,27 @@ def generate_forecast_from_trend_extrapolation(recent_data, hours_ahead=168):
     avg_older = last_48h[:min(24, len(last_48h))].mean(axis=0)
     trend = avg_recent - avg_older
     
-    # Generate future hours with trend continuation
-    forecast = []
-    for hour in range(hours_ahead):
-        # Gradually dampen the trend
-        damping = np.exp(-hour / 72)  # Exponential decay over 3 days
-        
-        # Project forward with dampened trend
-        daily_cycle = 0.1 * np.sin(2 * np.pi * hour / 24)
-        
-        # Base prediction with dampened trend
-        prediction = avg_recent + trend * damping
-        
-        # Add realistic daily cycle
-        prediction[0] += daily_cycle  # waveHeight
-        prediction[4] += daily_cycle * 2  # windSpeed
-        
-        # Add small random variations
-        noise = np.random.uniform(-0.05, 0.05, size=prediction.shape)
-        prediction += noise
-        
-        # Ensure sensible bounds
-        prediction = np.maximum(prediction, [0.3, 6.0, 0.2, 8.0, 5.0, 0.0])
-        prediction = np.minimum(prediction, [5.0, 20.0, 4.0, 18.0, 40.0, 360.0])
-        
-        forecast.append(prediction)
-    
-    return np.array(forecast)
+    # Generate all future hours at once with trend continuation
+    cycles = _cycles(hours_ahead)
+    
+    # Gradually dampen the trend (exponential decay over 3 days)
+    damping = cycles['damping'][:, None]
+    
+    # Base prediction with dampened trend, shape (hours_ahead, num_features)
+    forecast = avg_recent + trend * damping
+    
+    # Add realistic daily cycle
+    daily_cycle = cycles['daily']
+    forecast[:, 0] += daily_cycle  # waveHeight
+    forecast[:, 4] += daily_cycle * 2  # windSpeed
+    
+    # Add small random variations
+    noise = _rng.random(forecast.shape)
+    noise -= 0.5
+    noise *= 0.1
+    forecast += noise
+    
+    # Ensure sensible bounds, then wrap windDirection into [0, 360)
+    np.clip(forecast, _FORECAST_LOWER, _FORECAST_UPPER, out=forecast)
+    forecast[:, 5] %= 360.0
+    return forecast